@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Persistent Steam app catalog — static per-app metadata keyed by appid.
+Name, type, genres, early access, release date and is_free almost never change,
+so steam_trending refetches them only when an entry is missing or older than
+its TTL (short for unreleased games, whose release date still moves).
+build_dashboard and the summary reports read names and genres from here.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CATALOG_FILE = Path(__file__).parent / "steam_data" / "app_catalog.sqlite3"
+
+DAY = 24 * 3600
+STATIC_TTL = 14 * DAY
+UNRELEASED_TTL = DAY  # coming_soon entries: release date / early access flip
+
+# Stored fields, in column order (genres is JSON-encoded)
+FIELDS = ("name", "type", "genres", "is_early_access", "coming_soon", "release_date", "is_free")
+
+
+class AppCatalog:
+    def __init__(self, path=CATALOG_FILE):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self._db = None
+
+    def _conn(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS apps ("
+                " appid TEXT PRIMARY KEY, name TEXT, type TEXT, genres TEXT,"
+                " is_early_access INTEGER, coming_soon INTEGER, release_date TEXT,"
+                " is_free INTEGER, refreshed_at REAL)"
+            )
+            self._db = db
+        return self._db
+
+    @staticmethod
+    def _row_to_meta(row):
+        name, type_, genres, early, soon, release, free, refreshed = row
+        return {
+            "name": name or "",
+            "type": type_ or "game",
+            "genres": json.loads(genres or "[]"),
+            "is_early_access": bool(early),
+            "coming_soon": bool(soon),
+            "release_date": release or "",
+            "is_free": bool(free),
+            "refreshed_at": refreshed or 0.0,
+        }
+
+    def get_many(self, appids):
+        """{appid: metadata} for the appids present (fresh or stale)."""
+        appids = [str(a) for a in appids]
+        result = {}
+        with self.lock:
+            db = self._conn()
+            for i in range(0, len(appids), 500):
+                chunk = appids[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                for row in db.execute(
+                    f"SELECT appid, {', '.join(FIELDS)}, refreshed_at FROM apps WHERE appid IN ({marks})", chunk
+                ):
+                    result[row[0]] = self._row_to_meta(row[1:])
+        return result
+
+    @staticmethod
+    def is_fresh(meta, now=None):
+        ttl = UNRELEASED_TTL if meta.get("coming_soon") else STATIC_TTL
+        return (now or time.time()) - meta.get("refreshed_at", 0) < ttl
+
+    def put_many(self, entries):
+        """Store {appid: metadata} (normalized static fields) as refreshed now."""
+        now = time.time()
+        rows = [
+            (str(appid), meta.get("name", ""), meta.get("type", "game"), json.dumps(meta.get("genres", [])),
+             int(bool(meta.get("is_early_access"))), int(bool(meta.get("coming_soon"))),
+             meta.get("release_date", ""), int(bool(meta.get("is_free"))), now)
+            for appid, meta in entries.items()
+        ]
+        if not rows:
+            return
+        with self.lock:
+            db = self._conn()
+            db.executemany("INSERT OR REPLACE INTO apps VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            db.commit()
+
+    def names(self, appids=None):
+        """{appid: name}; all known apps when appids is None."""
+        if appids is not None:
+            return {a: m["name"] for a, m in self.get_many(appids).items() if m["name"]}
+        with self.lock:
+            rows = self._conn().execute("SELECT appid, name FROM apps WHERE name != ''").fetchall()
+        return dict(rows)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = AppCatalog()
+        return _catalog
@@ -11,6 +11,13 @@ from pathlib import Path
 from datetime import datetime
 
 SCRIPTS_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+import app_catalog
+import player_series
+import steam_trending
+import twitch_games
+import viewer_series
+
 DOCS_DATA_DIR = SCRIPTS_DIR.parent / "docs" / "data"
 
 # Snapshot sources
@@ -47,51 +54,45 @@ def build_gaming_trends_data():
 
     latest = snapshots[latest_date]
 
-    # Build top streamed list (ordered)
-    top_names = latest.get("top_game_names", [])
-    viewers = latest.get("viewers", {})
-    streams = latest.get("streams", {})
-
-    # Get previous day for % change
-    prev_date = sorted_dates[-2] if len(sorted_dates) >= 2 else None
-    prev_viewers = snapshots[prev_date].get("viewers", {}) if prev_date else {}
-
-    top_streamed = []
-    for name in top_names[:15]:
-        v = viewers.get(name, 0)
-        prev_v = prev_viewers.get(name, 0)
-        change = round(((v - prev_v) / prev_v) * 100, 1) if prev_v > 0 else None
+    # Games by id over aligned per-day arrays (twitch_games); names only for display
+    names = twitch_games.get_names()
+    days = [twitch_games.day_arrays(snapshots[d], names.ids_by_name()) for d in sorted_dates]
+    top_ids = list(days[-1].top)
+
+    # Sampler rollups (gaming_trends --sample) per game and day; on days with
+    # MIN_DAY_SAMPLES, daily averages replace the single report-time counts
+    day_objs = [datetime.strptime(d, "%Y-%m-%d").date() for d in sorted_dates]
+    rollups = viewer_series.get_series().daily(top_ids[:35], day_objs, min_samples=viewer_series.MIN_DAY_SAMPLES)
+    axis, viewer_cols, stream_cols = twitch_games.align(days)
+    row = {gid: i for i, gid in enumerate(axis)}
+    latest_viewers = viewer_cols[-1][:]  # report-time counts, before averages replace them
+    for gid, per_day in rollups.items():
+        for col, d in zip(viewer_cols, sorted_dates):
+            if d in per_day:
+                col[row[gid]] = per_day[d]["avg"]
+
+    def game_entry(gid):
+        i = row[gid]
+        name = names.name(gid)
+        entry = {"name": name, "viewers": latest_viewers[i], "streams": stream_cols[-1][i]}
+        today_stats = rollups.get(gid, {}).get(latest_date)
+        if today_stats:
+            entry.update(avg_viewers=today_stats["avg"], peak_viewers=today_stats["peak"],
+                         hours_watched=today_stats["hours_watched"])
+        v, prev_v = viewer_cols[-1][i], viewer_cols[-2][i] if len(viewer_cols) >= 2 else 0
+        entry["change_pct"] = round(((v - prev_v) / prev_v) * 100, 1) if prev_v > 0 else None
+        entry["sparkline"] = [col[i] for col in viewer_cols]
         slug = name.lower().replace(" ", "-").replace("'", "").replace(":", "").replace(".", "")
-        top_streamed.append({
-            "name": name,
-            "viewers": v,
-            "streams": streams.get(name, 0),
-            "change_pct": change,
-            "twitch_url": f"https://www.twitch.tv/directory/category/{slug}"
-        })
+        entry["twitch_url"] = f"https://www.twitch.tv/directory/category/{slug}"
+        return entry
 
-    breakout = []
-    top15_names = set(top_names[:15])
-    for name in top_names[15:35]:
-        if name in top15_names:
-            continue
-        v = viewers.get(name, 0)
-        prev_v = prev_viewers.get(name, 0)
-        change = round(((v - prev_v) / prev_v) * 100, 1) if prev_v > 0 else None
-        slug = name.lower().replace(" ", "-").replace("'", "").replace(":", "").replace(".", "")
-        breakout.append({
-            "name": name,
-            "viewers": v,
-            "streams": streams.get(name, 0),
-            "change_pct": change,
-            "twitch_url": f"https://www.twitch.tv/directory/category/{slug}"
-        })
+    top_streamed = [game_entry(gid) for gid in top_ids[:15]]
+    breakout = [game_entry(gid) for gid in top_ids[15:35]]
 
     # History for sparklines
     history = {}
-    for d in sorted_dates:
-        snap = snapshots[d]
-        history[d] = {"viewers": snap.get("viewers", {})}
+    for d, day, col in zip(sorted_dates, days, viewer_cols):
+        history[d] = {"viewers": {names.name(gid): col[row[gid]] for gid in day.ids}}
 
     # Parse latest output for sections we can't get from snapshots
     # (wishlisted, languages, just_released)
@@ -237,9 +238,16 @@ def build_steam_data():
     prev_trending_names = {g.get("name", "") for g in prev_snap.get("trending", [])}
     prev_topseller_names = {g.get("name", "") for g in prev_snap.get("topsellers", [])}
 
+    # Static metadata (names, genres) from the Steam app catalog
+    catalog = {}
+    if app_catalog.CATALOG_FILE.exists():
+        listed = latest.get("trending", []) + latest.get("topsellers", [])
+        appids = set(player_counts) | {g.get("appid") for g in listed if g.get("appid")}
+        catalog = app_catalog.get_catalog().get_many(appids)
+
     def build_game(item, prev_names=None):
         appid = item.get("appid", "")
-        name = item.get("name", "")
+        name = item.get("name", "") or catalog.get(appid, {}).get("name", "")
         players = item.get("players", 0) or player_counts.get(appid, 0)
         prev_p = prev_players.get(appid, 0)
         change = round(((players - prev_p) / prev_p) * 100, 1) if prev_p > 0 else None
@@ -257,7 +265,7 @@ def build_steam_data():
             "coming_soon": item.get("coming_soon", False),
             "is_early_access": item.get("is_early_access", False),
             "release_date": item.get("release_date", ""),
-            "genres": item.get("genres", []),
+            "genres": item.get("genres") or catalog.get(appid, {}).get("genres", []),
             "review": rev.get("desc", "") or item.get("review_desc", ""),
             "review_positive": rev.get("positive", 0),
             "review_negative": rev.get("negative", 0),
@@ -277,13 +285,20 @@ def build_steam_data():
     # Rising / Falling
     rising = []
     falling = []
-    name_lookup = {}
+    name_lookup = {appid: meta["name"] for appid, meta in catalog.items() if meta["name"]}
     for g in latest.get("trending", []) + latest.get("topsellers", []):
-        if g.get("appid"):
-            name_lookup[g["appid"]] = g.get("name", "")
-    if prev_players:
-        for appid, count in player_counts.items():
-            prev_p = prev_players.get(appid, 0)
+        if g.get("appid") and g.get("name"):
+            name_lookup.setdefault(g["appid"], g["name"])  # snapshots predating the catalog
+    # Prefer 24h averages from the intra-day sampler when both days have them
+    stats = latest.get("player_stats", {})
+    prev_stats = prev_snap.get("player_stats", {})
+    current_counts, previous_counts = player_counts, prev_players
+    if stats and prev_stats:
+        current_counts = {aid: st[1] for aid, st in stats.items() if aid in prev_stats}
+        previous_counts = {aid: prev_stats[aid][1] for aid in current_counts}
+    if previous_counts:
+        for appid, count in current_counts.items():
+            prev_p = previous_counts.get(appid, 0)
             if prev_p > 100:
                 abs_change = count - prev_p
                 pct = ((count - prev_p) / prev_p) * 100
@@ -292,6 +307,7 @@ def build_steam_data():
                     "appid": appid,
                     "players": count,
                     "prev_players": prev_p,
+                    "peak": stats.get(appid, [0])[0],
                     "abs_change": abs_change,
                     "pct_change": round(pct, 1),
                     "steam_url": f"https://store.steampowered.com/app/{appid}"
@@ -310,7 +326,7 @@ def build_steam_data():
         appid = deal.get("appid", "")
         disc = deal.get("discount", 0)
         final = deal.get("final", 0)
-        price = f"${final / 100:.2f}" if final else ""
+        price = steam_trending.fmt_price(final, deal.get("currency", "USD")) if final else ""
         specials.append({
             "name": name,
             "appid": appid,
@@ -341,11 +357,52 @@ def build_steam_data():
             "steam_url": f"https://store.steampowered.com/app/{g.get('appid', '')}"
         })
 
+    # Chart movers: top-seller rank gains below the enriched head (same rule as the report)
+    chart_movers = [{
+        "name": name,
+        "appid": appid,
+        "rank": rank,
+        "prev_rank": before,
+        "gained": gained,
+        "steam_url": f"https://store.steampowered.com/app/{appid}"
+    } for appid, name, before, rank, gained in steam_trending.chart_movers(
+        latest.get("chart_ranks", {}).get("topsellers", []),
+        prev_snap.get("chart_ranks", {}).get("topsellers", []),
+        skip_top=steam_trending.TOPSELLERS_LIMIT,
+    )]
+
+    # Regional charts (steam_trending --regions): local top sellers + games far above their US rank
+    regions = {}
+    for cc, data in latest.get("regions", {}).items():
+        regions[cc] = {
+            "topsellers": [{
+                "name": name,
+                "appid": appid,
+                "price": price,
+                "discount_pct": discount,
+                "steam_url": f"https://store.steampowered.com/app/{appid}"
+            } for appid, name, price, discount in data.get("topsellers", [])[:10]],
+            "standouts": [{
+                "name": name,
+                "appid": appid,
+                "rank": rank,
+                "us_rank": us_rank,
+                "steam_url": f"https://store.steampowered.com/app/{appid}"
+            } for appid, name, rank, us_rank in latest.get("region_rank_diff", {}).get(cc, [])],
+        }
+
     # History for sparklines
     history = {}
     for d in sorted_dates:
         snap = snapshots[d]
-        history[d] = {"player_counts": snap.get("player_counts", {})}
+        history[d] = {"player_counts": snap.get("player_counts", {}), "player_peaks": {}, "player_avgs": {}}
+    # Daily peak/average rollups from the player sampler, where available
+    if player_series.SERIES_DIR.exists():
+        days = [datetime.strptime(d, "%Y-%m-%d").date() for d in sorted_dates]
+        for appid, per_day in player_series.get_series().daily(player_counts, days).items():
+            for d, (peak, avg, _low) in per_day.items():
+                history[d]["player_peaks"][appid] = peak
+                history[d]["player_avgs"][appid] = avg
 
     return {
         "updated": latest.get("date", datetime.now().isoformat()),
@@ -358,6 +415,8 @@ def build_steam_data():
         "specials": specials[:8],
         "wishlisted": wishlisted[:10],
         "watch": watch[:6],
+        "chart_movers": chart_movers[:8],
+        "regions": regions,
         "history": history
     }
 
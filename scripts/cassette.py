@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Record/replay layer for every upstream call — lets reports run offline.
+Set CASSETTE_MODE=record to capture real responses (HTTP via http_client plus
+GA4 run_report / GSC searchanalytics queries) into scripts/cassettes/<name>.json,
+then CASSETTE_MODE=replay to serve them back deterministically with no network
+and no credentials. CASSETTE_NAME picks the file (default "default").
+
+Secrets (API keys, client secrets, the Telegram bot token) are stripped from
+request keys, and SECRET_FIELDS in JSON response bodies (the Twitch OAuth
+access_token) are replaced with a placeholder before anything is written to
+disk; replay never fetches a token, so the placeholder is never sent. All other
+response content is recorded verbatim. A request without an exact match falls
+back to matching by method + host + path in recorded order; every recorded
+interaction is served once, whichever way it matched. IGDB sub-queries are also
+recorded one by one (gaming_trends.IgdbBatcher), since how they are packed into
+/multiquery requests depends on thread timing, and the IGDB mirror records the
+clock and watermarks its sync queries are built from (igdb_mirror.sync).
+"""
+
+import atexit
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import urllib.parse
+from pathlib import Path
+
+CASSETTE_DIR = Path(__file__).parent / "cassettes"
+SECRET_PARAMS = {"key", "client_secret", "access_token", "refresh_token"}
+SECRET_FIELDS = {"access_token", "refresh_token", "client_secret", "id_token"}  # in JSON responses ("key" is data there)
+
+_lock = threading.Lock()
+_state = None
+
+
+def mode():
+    value = os.environ.get("CASSETTE_MODE", "").strip().lower()
+    return value if value in ("record", "replay") else "off"
+
+
+def replaying():
+    return mode() == "replay"
+
+
+def recording():
+    return mode() == "record"
+
+
+def cassette_path():
+    name = os.environ.get("CASSETTE_NAME", "").strip() or "default"
+    return CASSETTE_DIR / f"{name}.json"
+
+
+# ── Keys ─────────────────────────────────────────────────────────────────────
+
+def _redact_query(query):
+    pairs = urllib.parse.parse_qsl(query, keep_blank_values=True)
+    return urllib.parse.urlencode(sorted((k, "<redacted>" if k in SECRET_PARAMS else v) for k, v in pairs))
+
+
+def redact_url(url):
+    parts = urllib.parse.urlsplit(url)
+    path = re.sub(r"/bot[^/]+/", "/bot<redacted>/", parts.path)
+    return urllib.parse.urlunsplit((parts.scheme, parts.netloc.lower(), path, _redact_query(parts.query), ""))
+
+
+def redact_body(body):
+    """Form bodies carrying secrets get those values redacted; anything else is kept."""
+    if body is None:
+        return ""
+    text = body.decode("utf-8", errors="replace") if isinstance(body, bytes) else str(body)
+    try:
+        pairs = urllib.parse.parse_qsl(text, keep_blank_values=True, strict_parsing=True)
+    except ValueError:
+        return text
+    if any(k in SECRET_PARAMS for k, _ in pairs):
+        return _redact_query(text)
+    return text
+
+
+def _redact_json(value):
+    if isinstance(value, dict):
+        return {k: "<redacted>" if k in SECRET_FIELDS else _redact_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_redact_json(v) for v in value]
+    return value
+
+
+def redact_response(body):
+    """JSON response bodies with SECRET_FIELDS values replaced; other bodies unchanged."""
+    if not body or body.lstrip()[:1] not in (b"{", b"["):
+        return body
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    redacted = _redact_json(data)
+    return body if redacted == data else json.dumps(redacted).encode("utf-8")
+
+
+def _exact_key(method, url, body):
+    raw = f"{method}\0{redact_url(url)}\0{redact_body(body)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _loose_key(method, url):
+    parts = urllib.parse.urlsplit(redact_url(url))
+    return f"{method} {parts.netloc}{parts.path}"
+
+
+# ── Storage ──────────────────────────────────────────────────────────────────
+
+class _Cassette:
+    def __init__(self, path):
+        self.path = path
+        self.interactions = []
+        self.exact = {}
+        self.loose = {}
+        self.served = set()  # ids of interactions already served
+        self.dirty = False
+
+    def load(self):
+        if not self.path.exists():
+            raise FileNotFoundError(f"No cassette at {self.path} — record one with CASSETTE_MODE=record")
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.interactions = json.load(f).get("interactions", [])
+        for item in self.interactions:
+            self.exact.setdefault(item["key"], []).append(item)
+            self.loose.setdefault(item["loose"], []).append(item)
+
+    def next_for(self, key, loose):
+        """Next unserved recorded interaction for key, else for loose. An interaction
+        served through either index is not served again; when all are used up, the
+        last match repeats."""
+        for index, k in ((self.exact, key), (self.loose, loose)):
+            for item in index.get(k, ()):
+                if id(item) not in self.served:
+                    self.served.add(id(item))
+                    return item
+        items = self.exact.get(key) or self.loose.get(loose)
+        return items[-1] if items else None
+
+    def add(self, item):
+        self.interactions.append(item)
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"interactions": self.interactions}, f, indent=1, ensure_ascii=False)
+        self.dirty = False
+
+
+def _get_state():
+    global _state
+    with _lock:
+        if _state is None:
+            _state = _Cassette(cassette_path())
+            if replaying():
+                _state.load()
+            elif recording():
+                atexit.register(save)
+        return _state
+
+
+def save():
+    """Write recorded interactions to disk (also runs at exit in record mode)."""
+    with _lock:
+        if _state is not None:
+            _state.save()
+
+
+def _encode_body(body):
+    try:
+        return {"text": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(item):
+    if "base64" in item:
+        return base64.b64decode(item["base64"])
+    return item.get("text", "").encode("utf-8")
+
+
+# ── HTTP hooks (called by http_client.request) ───────────────────────────────
+
+def record_http(method, url, body, status, headers, resp_body, error=""):
+    state = _get_state()
+    item = {
+        "key": _exact_key(method, url, body),
+        "loose": _loose_key(method, url),
+        "method": method,
+        "url": redact_url(url),
+        "status": status,
+        "headers": {k: v for k, v in (headers or {}).items() if k != "set-cookie"},
+        "error": error,
+        **_encode_body(redact_response(resp_body or b"")),
+    }
+    with _lock:
+        state.add(item)
+
+
+def replay_http(method, url, body):
+    """Return (status, headers, body, error) for a recorded request, or None on a miss."""
+    state = _get_state()
+    with _lock:
+        item = state.next_for(_exact_key(method, url, body), _loose_key(method, url))
+    if item is None:
+        return None
+    return item["status"], item["headers"], _decode_body(item), item.get("error", "")
+
+
+# ── Generic hook for SDK calls (GA4, GSC) ────────────────────────────────────
+
+def through(kind, key_data, fetch, dump=json.dumps, load=json.loads, loose=True):
+    """Run fetch() through the cassette.
+
+    kind names the call (e.g. "ga4.run_report"), key_data is a JSON-able
+    description of the request, dump/load convert the result to/from a string.
+    On replay, a call without an exact match gets the next recorded `kind`
+    result, or raises LookupError when loose is False.
+    """
+    current = mode()
+    if current == "off":
+        return fetch()
+    key_text = json.dumps(key_data, sort_keys=True, default=str)
+    key = hashlib.sha256(f"{kind}\0{key_text}".encode("utf-8")).hexdigest()
+    state = _get_state()
+    if current == "replay":
+        with _lock:
+            item = state.next_for(key, kind if loose else None)
+        if item is None:
+            raise LookupError(f"No recorded {kind} response for {key_text[:200]}")
+        return load(item["text"])
+    result = fetch()
+    with _lock:
+        state.add({"key": key, "loose": kind, "method": kind, "url": "",
+                   "status": 200, "headers": {}, "error": "", "text": dump(result)})
+    return result
@@ -6,13 +6,12 @@ No authentication required (free public API).
 
 import json
 import sys
-import time
-import urllib.request
-import urllib.parse
 from pathlib import Path
 from datetime import datetime, timedelta
 
-REQUEST_DELAY = 0.4
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 DATA_DIR = Path(__file__).parent / "cheapshark_data"
 SNAPSHOT_FILE = DATA_DIR / "daily_snapshots.json"
 
@@ -24,16 +23,7 @@ BASE_URL = "https://www.cheapshark.com/api/1.0"
 def cs_get(endpoint, params=None):
     """GET request to CheapShark API."""
     url = f"{BASE_URL}/{endpoint}"
-    if params:
-        url += "?" + urllib.parse.urlencode(params)
-    req = urllib.request.Request(url, headers={"User-Agent": "OGGamingDashboard/1.0"})
-    time.sleep(REQUEST_DELAY)
-    try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read())
-    except Exception as e:
-        print(f"  CheapShark error ({endpoint}): {e}", file=sys.stderr)
-        return []
+    return http_client.fetch_json(url, params, default=[], label=f"CheapShark ({endpoint})")
 
 
 def safe_html(text):
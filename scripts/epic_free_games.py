@@ -6,12 +6,12 @@ No authentication required (public endpoint).
 
 import json
 import sys
-import urllib.request
-import urllib.parse
 from pathlib import Path
 from datetime import datetime, timedelta
 
-REQUEST_DELAY = 0.3
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 DATA_DIR = Path(__file__).parent / "epic_free_data"
 SNAPSHOT_FILE = DATA_DIR / "daily_snapshots.json"
 
@@ -86,25 +86,14 @@ def parse_game(game, upcoming=False):
 
 def fetch_egs_free_games():
     """Fetch current and upcoming free games from EGS promotions endpoint."""
-    params = urllib.parse.urlencode({
+    params = {
         "locale": "en-US",
         "country": "US",
         "allowCountries": "US",
-    })
-    url = f"{EGS_FREE_URL}?{params}"
-    req = urllib.request.Request(url, headers={
-        "User-Agent": "OGGamingDashboard/1.0",
-        "Accept": "application/json",
-    })
-
-    import time
-    time.sleep(REQUEST_DELAY)
+    }
 
-    try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            data = json.loads(resp.read())
-    except Exception as e:
-        print(f"  EGS API error: {e}", file=sys.stderr)
+    data = http_client.fetch_json(EGS_FREE_URL, params, label="EGS API")
+    if data is None:
         return [], []
 
     elements = data.get("data", {}).get("Catalog", {}).get("searchStore", {}).get("elements", [])
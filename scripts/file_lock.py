@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Cross-process exclusive lock on a lock file — for stores that the samplers and
+the daily reports write from separate processes (player_series, viewer_series).
+threading.Lock only covers one process; this takes an OS-level lock
+(fcntl.flock on POSIX, msvcrt.locking on Windows) for the duration of a block.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def locked(path):
+    """Hold an exclusive lock on `path` (created if missing) while the block runs."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # retries for ~10s, then raises
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
@@ -16,12 +16,14 @@ from urllib.parse import unquote
 
 from google.analytics.data_v1beta import BetaAnalyticsDataClient
 from google.analytics.data_v1beta.types import (
-    DateRange, Dimension, Metric, RunReportRequest, OrderBy
+    DateRange, Dimension, Metric, RunReportRequest, RunReportResponse, OrderBy
 )
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build as gapi_build
 import pytz
 
+import cassette
+
 # Configuration
 GA4_PROPERTY_ID = "334095714"
 GSC_SITE_URL = "sc-domain:gam3s.gg"
@@ -223,6 +225,10 @@ def compact_num(n: int) -> str:
 
 class GAM3SInsights:
     def __init__(self):
+        if cassette.replaying() and not CREDS_PATH.exists():
+            # Offline replay: every GA4/GSC call is served from the cassette
+            self.creds = self.ga4 = self.gsc = None
+            return
         self.creds = Credentials.from_service_account_file(
             CREDS_PATH,
             scopes=[
@@ -233,6 +239,19 @@ class GAM3SInsights:
         self.ga4 = BetaAnalyticsDataClient(credentials=self.creds)
         self.gsc = gapi_build('searchconsole', 'v1', credentials=self.creds)
 
+    def _run_report(self, req: RunReportRequest) -> RunReportResponse:
+        return cassette.through(
+            "ga4.run_report", RunReportRequest.to_dict(req),
+            lambda: self.ga4.run_report(req),
+            dump=RunReportResponse.to_json, load=RunReportResponse.from_json,
+        )
+
+    def _gsc_query(self, body: dict) -> dict:
+        return cassette.through(
+            "gsc.searchanalytics.query", body,
+            lambda: self.gsc.searchanalytics().query(siteUrl=GSC_SITE_URL, body=body).execute(),
+        )
+
     def _fetch_pages(self, start: str, end: str, limit: int = 200):
         req = RunReportRequest(
             property=f"properties/{GA4_PROPERTY_ID}",
@@ -252,7 +271,7 @@ class GAM3SInsights:
             order_bys=[OrderBy(metric=OrderBy.MetricOrderBy(metric_name="sessions"), desc=True)],
             limit=limit,
         )
-        report = self.ga4.run_report(req)
+        report = self._run_report(req)
         return [PageRow(row, date_val=True) for row in report.rows]
 
     def _fetch_langs(self, start: str, end: str):
@@ -271,7 +290,7 @@ class GAM3SInsights:
             order_bys=[OrderBy(metric=OrderBy.MetricOrderBy(metric_name="sessions"), desc=True)],
             limit=500,
         )
-        report = self.ga4.run_report(req)
+        report = self._run_report(req)
         return [LangRow(row, has_date=True) for row in report.rows]
 
     def _fetch_gsc_queries(self, start: str, end: str, limit: int = 500) -> List[GSCRow]:
@@ -279,7 +298,7 @@ class GAM3SInsights:
             'startDate': start, 'endDate': end,
             'dimensions': ['query'], 'rowLimit': limit, 'dataState': 'all',
         }
-        resp = self.gsc.searchanalytics().query(siteUrl=GSC_SITE_URL, body=body).execute()
+        resp = self._gsc_query(body)
         return [GSCRow(row) for row in resp.get('rows', [])]
 
     def _fetch_gsc_pages(self, start: str, end: str, limit: int = 200) -> List[dict]:
@@ -287,7 +306,7 @@ class GAM3SInsights:
             'startDate': start, 'endDate': end,
             'dimensions': ['page'], 'rowLimit': limit, 'dataState': 'all',
         }
-        resp = self.gsc.searchanalytics().query(siteUrl=GSC_SITE_URL, body=body).execute()
+        resp = self._gsc_query(body)
         return resp.get('rows', [])
 
     def save_snapshot(self, data: dict):
@@ -6,16 +6,26 @@ top games by language/region, and upcoming/anticipated releases (IGDB + Steam wi
 """
 
 import json
+import os
 import sys
+import threading
 import time
-import urllib.request
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 
-REQUEST_DELAY = 0.3
+sys.path.insert(0, str(Path(__file__).parent))
+import cassette
+import http_client
+import igdb_mirror
+import twitch_auth
+import twitch_games
+import viewer_series
+
 DATA_DIR = Path(__file__).parent / "gaming_trends_data"
 SNAPSHOT_FILE = DATA_DIR / "daily_snapshots.json"
+IGDB_MEMO_FILE = DATA_DIR / "igdb_ids.json"  # lowercased game name -> IGDB id, kept across runs
 CREDS_FILE = Path.home() / ".openclaw" / "credentials" / "twitch-api.json"
 STEAM_KEY_FILE = Path.home() / ".openclaw" / "credentials" / "steam-api.json"
 
@@ -29,6 +39,36 @@ BLACKLIST_CATEGORIES = {
     "djs", "slots", "games + demos",
 }
 
+# games/top depth per section; TwitchDirectory pages the directory once to the deepest
+TOP_COUNT = 15
+BREAKOUT_DEPTH = 50       # breakout candidates are ranks TOP_COUNT+1 .. BREAKOUT_DEPTH
+BREAKOUT_CANDIDATES = 20
+
+# Per-game stream totals: Helix lists a game's streams by viewers (desc), so paging
+# stops once a page ends below STREAM_MIN_VIEWERS or STREAM_PAGE_BUDGET pages are read
+STREAM_MIN_VIEWERS = 5
+STREAM_PAGE_BUDGET = 10
+STREAM_WORKERS = 8
+
+# Global sweep (default; --per-game pages each game instead): one pass over all live
+# streams by viewers (desc) down to SWEEP_MIN_VIEWERS feeds the top, breakout and
+# language sections together
+SWEEP_MIN_VIEWERS = 10
+SWEEP_PAGE_BUDGET = 300
+
+# Intra-day sampler (--sample): per-game viewers/streams from one streams sweep into
+# viewer_series; games below SAMPLE_MIN_GAME_VIEWERS in a pass are not recorded
+# (nor kept in the daily snapshot beyond the ranked listing)
+SAMPLE_MIN_GAME_VIEWERS = 50
+
+# Upcoming releases window (days ahead), answered from the local IGDB mirror
+UPCOMING_DAYS = 180
+
+# IGDB /multiquery: named sub-queries per request, and how long the batcher waits
+# for queries from other sections to share a request with
+IGDB_MULTIQUERY_MAX = 10
+IGDB_BATCH_WINDOW = 0.05
+
 # Top languages to track (ISO 639-1 codes)
 TRACKED_LANGUAGES = {
     "en": "English", "es": "Spanish", "pt": "Portuguese",
@@ -40,6 +80,8 @@ TRACKED_LANGUAGES = {
 # ── Auth ──────────────────────────────────────────────────────────────────────
 
 def load_credentials():
+    if http_client.credentials_optional() and not CREDS_FILE.exists():
+        return {"client_id": "replay", "client_secret": "replay"}
     with open(CREDS_FILE, "r", encoding="utf-8") as f:
         return json.load(f)
 
@@ -50,60 +92,112 @@ def load_steam_key():
     except Exception:
         return ""
 
-def get_access_token(client_id, client_secret):
-    """Get OAuth2 app access token (client credentials flow)."""
-    url = "https://id.twitch.tv/oauth2/token"
-    data = urllib.parse.urlencode({
-        "client_id": client_id,
-        "client_secret": client_secret,
-        "grant_type": "client_credentials"
-    }).encode()
-    req = urllib.request.Request(url, data=data, method="POST")
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        return json.loads(resp.read())["access_token"]
-
 # ── API helpers ───────────────────────────────────────────────────────────────
 
-def twitch_get(endpoint, params, client_id, token):
+def twitch_get(endpoint, params, client_id, auth):
     """GET request to Twitch Helix API."""
-    qs = urllib.parse.urlencode(params)
-    url = f"https://api.twitch.tv/helix/{endpoint}?{qs}"
-    req = urllib.request.Request(url, headers={
+    url = f"https://api.twitch.tv/helix/{endpoint}"
+    return auth.call(lambda token: http_client.get_json(url, params, headers={
         "Client-Id": client_id,
         "Authorization": f"Bearer {token}"
-    })
-    time.sleep(REQUEST_DELAY)
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        return json.loads(resp.read())
+    }))
 
-def igdb_post(endpoint, body, client_id, token):
+def igdb_post(endpoint, body, client_id, auth):
     """POST request to IGDB API (Apicalypse query syntax)."""
     url = f"https://api.igdb.com/v4/{endpoint}"
-    req = urllib.request.Request(url, data=body.encode("utf-8"), method="POST", headers={
-        "Client-Id": client_id,
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "text/plain"
-    })
-    time.sleep(REQUEST_DELAY)
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read())
-    except Exception as e:
-        print(f"  IGDB error ({endpoint}): {e}", file=sys.stderr)
+        result = auth.call(lambda token: http_client.post_json(url, body, headers={
+            "Client-Id": client_id,
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "text/plain"
+        }))
+    except (http_client.HttpError, ValueError) as e:
+        print(f"  IGDB ({endpoint}) error: {e}", file=sys.stderr)
         return []
+    return [] if result is None else result
+
+class IgdbBatcher:
+    """Packs IGDB queries issued at about the same time (e.g. by report sections
+    running on different threads) into /multiquery requests of up to
+    IGDB_MULTIQUERY_MAX named sub-queries. query()/query_many() block until their
+    results are in; a failed request yields [] for each of its sub-queries."""
+
+    def __init__(self, client_id, auth, window=IGDB_BATCH_WINDOW):
+        self.client_id = client_id
+        self.auth = auth
+        self.window = window
+        self.lock = threading.Lock()
+        self.pending = []
+        self.timer = None
+
+    def query(self, endpoint, body):
+        return self.query_many([(endpoint, body)])[0]
+
+    def query_many(self, queries):
+        """Results for [(endpoint, body), ...], in order."""
+        slots = [{"endpoint": e, "body": b, "done": threading.Event(), "result": []} for e, b in queries]
+        with self.lock:
+            self.pending.extend(slots)
+            while len(self.pending) >= IGDB_MULTIQUERY_MAX:
+                chunk, self.pending = self.pending[:IGDB_MULTIQUERY_MAX], self.pending[IGDB_MULTIQUERY_MAX:]
+                threading.Thread(target=self._send, args=(chunk,), daemon=True).start()
+            if self.pending and self.timer is None:
+                self.timer = threading.Timer(self.window, self._flush)
+                self.timer.daemon = True
+                self.timer.start()
+        for slot in slots:
+            slot["done"].wait()
+        return [slot["result"] for slot in slots]
+
+    def _flush(self):
+        with self.lock:
+            chunk, self.pending, self.timer = self.pending, [], None
+        if chunk:
+            self._send(chunk)
+
+    def _send(self, chunk):
+        # Sub-queries go through the cassette one by one: which of them share a
+        # /multiquery request depends on thread timing, so whole requests don't replay
+        try:
+            if cassette.replaying():
+                for slot in chunk:
+                    try:
+                        slot["result"] = cassette.through("igdb.query", [slot["endpoint"], slot["body"]],
+                                                          list, loose=False)
+                    except LookupError:
+                        slot["result"] = []  # not asked on the recorded run
+                return
+            body = "".join(f'query {slot["endpoint"]} "q{i}" {{ {slot["body"]} }};\n'
+                           for i, slot in enumerate(chunk))
+            results = {r.get("name"): r.get("result", [])
+                       for r in igdb_post("multiquery", body, self.client_id, self.auth)
+                       if isinstance(r, dict)}
+            for i, slot in enumerate(chunk):
+                slot["result"] = results.get(f"q{i}") or []
+                if cassette.recording():
+                    cassette.through("igdb.query", [slot["endpoint"], slot["body"]], lambda: slot["result"])
+        finally:
+            for slot in chunk:
+                slot["done"].set()
+
+def load_igdb_memo():
+    try:
+        with open(IGDB_MEMO_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_igdb_memo(memo):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = IGDB_MEMO_FILE.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(memo, f, indent=1, sort_keys=True)
+    os.replace(tmp, IGDB_MEMO_FILE)
 
 def steam_get(url, params=None):
     """GET request to Steam Store API."""
-    if params:
-        url += "?" + urllib.parse.urlencode(params)
-    req = urllib.request.Request(url, headers={"User-Agent": "GamingTrends/1.0"})
-    time.sleep(REQUEST_DELAY)
-    try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read())
-    except Exception as e:
-        print(f"  Steam error: {e}", file=sys.stderr)
-        return {}
+    return http_client.fetch_json(url, params, headers={"User-Agent": "GamingTrends/1.0"},
+                                  default={}, label="Steam")
 
 # ── Formatting helpers ────────────────────────────────────────────────────────
 
@@ -190,7 +284,7 @@ def save_snapshot(snapshots, today_key, data):
     cutoff = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
     snapshots = {k: v for k, v in snapshots.items() if k >= cutoff}
     with open(SNAPSHOT_FILE, "w", encoding="utf-8") as f:
-        json.dump(snapshots, f, indent=2)
+        json.dump(snapshots, f, separators=(",", ":"))  # game arrays: one line per day, not per value
     return snapshots
 
 def get_previous_snapshot(snapshots, today_key):
@@ -202,7 +296,7 @@ def get_previous_snapshot(snapshots, today_key):
 def is_game_category(name):
     return name.lower() not in BLACKLIST_CATEGORIES
 
-def fetch_top_games(client_id, token, count=100):
+def fetch_top_games(client_id, auth, count=100):
     """Fetch top games by current viewer count, filtering non-game categories."""
     games = []
     cursor = None
@@ -211,7 +305,7 @@ def fetch_top_games(client_id, token, count=100):
         params = {"first": 100}
         if cursor:
             params["after"] = cursor
-        resp = twitch_get("games/top", params, client_id, token)
+        resp = twitch_get("games/top", params, client_id, auth)
         batch = resp.get("data", [])
         if not batch:
             break
@@ -224,49 +318,165 @@ def fetch_top_games(client_id, token, count=100):
             break
     return games
 
-def enrich_with_streams(client_id, token, games, count=15):
-    """Get viewer + stream counts for top N games."""
-    results = []
-    for game in games[:count]:
-        game_id = game["id"]
-        game_name = game["name"]
-        resp = twitch_get("streams", {"game_id": game_id, "first": 100}, client_id, token)
-        streams = resp.get("data", [])
-        total_viewers = sum(s.get("viewer_count", 0) for s in streams)
-        stream_count = len(streams)
-        results.append({
-            "id": game_id,
-            "name": game_name,
-            "viewers": total_viewers,
-            "streams": stream_count,
-        })
-    return results
-
-def fetch_breakout_games(client_id, token, top_game_ids, count=50):
-    """Fetch games outside top N to find breakout titles.
-    We look at lower-ranked games and compare to yesterday's snapshot."""
-    games = fetch_top_games(client_id, token, count=count)
-    breakout_candidates = [g for g in games if g["id"] not in top_game_ids]
-    # Enrich top 20 candidates with stream data
-    results = []
-    for game in breakout_candidates[:20]:
-        game_id = game["id"]
-        game_name = game["name"]
-        resp = twitch_get("streams", {"game_id": game_id, "first": 100}, client_id, token)
-        streams = resp.get("data", [])
-        total_viewers = sum(s.get("viewer_count", 0) for s in streams)
-        stream_count = len(streams)
-        results.append({
-            "id": game_id,
-            "name": game_name,
-            "viewers": total_viewers,
-            "streams": stream_count,
-        })
-    return results
-
-def fetch_top_by_language(client_id, token, lang_code, limit=3):
+def aggregate_streams(client_id, auth, game_id, min_viewers=STREAM_MIN_VIEWERS, max_pages=STREAM_PAGE_BUDGET):
+    """Viewer and stream totals for one game, following the streams cursor.
+    Returns {"viewers", "streams", "exact", "tail_max"}. When paging stops early
+    the totals are lower bounds (exact=False) and no unread stream has more than
+    tail_max viewers."""
+    viewers = streams = 0
+    seen = set()
+    cursor = None
+    last = 0
+    for _ in range(max_pages):
+        params = {"game_id": game_id, "first": 100}
+        if cursor:
+            params["after"] = cursor
+        resp = twitch_get("streams", params, client_id, auth)
+        page = resp.get("data", [])
+        for s in page:
+            # Streams shifting between pages can show up twice
+            if s.get("id") not in seen:
+                seen.add(s.get("id"))
+                viewers += s.get("viewer_count", 0)
+                streams += 1
+        cursor = resp.get("pagination", {}).get("cursor")
+        if not page or not cursor:
+            return {"viewers": viewers, "streams": streams, "exact": True, "tail_max": 0}
+        last = page[-1].get("viewer_count", 0)
+        if last < min_viewers:
+            break
+    return {"viewers": viewers, "streams": streams, "exact": False, "tail_max": last}
+
+def aggregate_games(client_id, auth, games, max_workers=STREAM_WORKERS):
+    """aggregate_streams for every game at once, in the order given; per-host
+    pacing is left to rate_limiter."""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        totals = pool.map(lambda g: aggregate_streams(client_id, auth, g["id"]), games)
+        return [{"id": g["id"], "name": g["name"], **t} for g, t in zip(games, totals)]
+
+class StreamSweep:
+    """Viewer and stream counters per game and per (language, game) from one pass
+    over the global streams list (see sweep_streams)."""
+
+    def __init__(self):
+        self.games = {}   # game_id -> [viewers, streams]
+        self.langs = {}   # (language, game_id) -> [viewers, streams]
+        self.names = {}   # game_id -> name
+        self.seen = set()
+        self.complete = False  # reached the end of the list: every total is exact
+        self.tail_max = 0      # otherwise no unread stream has more viewers than this
+
+    def add(self, stream):
+        gid = stream.get("game_id", "")
+        if not gid or stream.get("id") in self.seen:
+            return
+        self.seen.add(stream.get("id"))
+        viewers = stream.get("viewer_count", 0)
+        for key, counters in ((gid, self.games), ((stream.get("language", ""), gid), self.langs)):
+            c = counters.setdefault(key, [0, 0])
+            c[0] += viewers
+            c[1] += 1
+        self.names[gid] = stream.get("game_name", "")
+
+    def totals(self, game):
+        viewers, streams = self.games.get(game["id"], (0, 0))
+        return {"id": game["id"], "name": game["name"], "viewers": viewers, "streams": streams,
+                "exact": self.complete, "tail_max": self.tail_max}
+
+    def top_by_language(self, lang_code, limit=3):
+        ranked = sorted(((c[0], gid) for (lang, gid), c in self.langs.items()
+                         if lang == lang_code and self.names.get(gid) and is_game_category(self.names[gid])),
+                        reverse=True)[:limit]
+        return [(self.names[gid], viewers) for viewers, gid in ranked]
+
+def sweep_streams(client_id, auth, min_viewers=SWEEP_MIN_VIEWERS, max_pages=SWEEP_PAGE_BUDGET):
+    """Page through all live streams (viewers desc) until a page ends below
+    min_viewers, the list ends or max_pages run out, counting as it goes."""
+    sweep = StreamSweep()
+    cursor = None
+    for _ in range(max_pages):
+        params = {"first": 100}
+        if cursor:
+            params["after"] = cursor
+        resp = twitch_get("streams", params, client_id, auth)
+        page = resp.get("data", [])
+        for stream in page:
+            sweep.add(stream)
+        cursor = resp.get("pagination", {}).get("cursor")
+        if not page or not cursor:
+            sweep.complete = True
+            break
+        sweep.tail_max = page[-1].get("viewer_count", 0)
+        if sweep.tail_max < min_viewers:
+            break
+    return sweep
+
+class TwitchDirectory:
+    """games/top for one run: paged once to the deepest rank any section needs,
+    then top-N, rank-range and id -> rank queries are answered from memory.
+    Ranks are 1-based and count game categories only."""
+
+    def __init__(self, games):
+        self.games = games
+        self._ranks = {g["id"]: i for i, g in enumerate(games, 1)}
+
+    @classmethod
+    def fetch(cls, client_id, auth, depth):
+        return cls(fetch_top_games(client_id, auth, count=depth))
+
+    def top(self, n):
+        return self.games[:n]
+
+    def ranks(self, first, last):
+        """Games ranked first..last (inclusive)."""
+        return self.games[first - 1:last]
+
+    def rank(self, game_id):
+        return self._ranks.get(game_id)
+
+def sweep_games(sweep, min_viewers=SAMPLE_MIN_GAME_VIEWERS):
+    """[(game id, viewers, streams), ...] for the game categories in a sweep, most watched first."""
+    return sorted(((gid, c[0], c[1]) for gid, c in sweep.games.items()
+                   if c[0] >= min_viewers and is_game_category(sweep.names.get(gid, ""))),
+                  key=lambda r: -r[1])
+
+def record_sweep(sweep, min_viewers=SAMPLE_MIN_GAME_VIEWERS):
+    """Write a sweep's per-game totals to viewer_series. Returns the number of games recorded."""
+    samples = {gid: (viewers, streams) for gid, viewers, streams in sweep_games(sweep, min_viewers)}
+    series = viewer_series.get_series()
+    series.record(samples, {gid: sweep.names[gid] for gid in samples})
+    series.prune()
+    return len(samples)
+
+def run_sampler(every_minutes=0):
+    """--sample: one sweep (for cron), or one every `every_minutes` until interrupted."""
+    creds = load_credentials()
+    auth = twitch_auth.TokenStore(creds["client_id"], creds["client_secret"])
+    while True:
+        started = time.monotonic()
+        n = record_sweep(sweep_streams(creds["client_id"], auth))
+        print(f"{datetime.now():%Y-%m-%d %H:%M} sampled {n} games", file=sys.stderr)
+        if not every_minutes:
+            return
+        time.sleep(max(every_minutes * 60 - (time.monotonic() - started), 0))
+
+def enrich_with_streams(client_id, auth, games, count=15, sweep=None):
+    """Get viewer + stream counts for top N games (from `sweep` when given)."""
+    if sweep:
+        return [sweep.totals(g) for g in games[:count]]
+    return aggregate_games(client_id, auth, games[:count])
+
+def fetch_breakout_games(client_id, auth, directory, sweep=None):
+    """Stream totals for the games ranked just below the top list, to find breakout
+    titles. We look at lower-ranked games and compare to yesterday's snapshot."""
+    candidates = directory.ranks(TOP_COUNT + 1, BREAKOUT_DEPTH)[:BREAKOUT_CANDIDATES]
+    return enrich_with_streams(client_id, auth, candidates, count=BREAKOUT_CANDIDATES, sweep=sweep)
+
+def fetch_top_by_language(client_id, auth, lang_code, limit=3, sweep=None):
     """Get top games for a specific language by looking at top streams."""
-    resp = twitch_get("streams", {"language": lang_code, "first": 100}, client_id, token)
+    if sweep:
+        return sweep.top_by_language(lang_code, limit)
+    resp = twitch_get("streams", {"language": lang_code, "first": 100}, client_id, auth)
     streams = resp.get("data", [])
     # Aggregate viewers per game
     game_viewers = {}
@@ -315,72 +525,28 @@ def fetch_steam_wishlisted():
 
 # ── IGDB data ─────────────────────────────────────────────────────────────────
 
-def fetch_upcoming_releases(client_id, token):
-    """Notable games releasing in next 60 days with exact dates.
+def fetch_upcoming_releases(mirror=None, days=UPCOMING_DAYS):
+    """Notable games releasing in the next `days` with exact dates (IGDB mirror).
     Filters to hypes >= 3 to exclude shovelware."""
+    mirror = mirror or igdb_mirror.get_mirror()
     now_dt = datetime.now()
     now = int(now_dt.timestamp())
-    future = int((now_dt + timedelta(days=60)).timestamp())
-
-    # Fetch all hyped games in next 60 days, paginated
-    games = []
-    seen_ids = set()
-    for offset in range(0, 1000, 500):
-        body = (
-            f"fields name,url,hypes,follows,total_rating,first_release_date,platforms.name;"
-            f" where first_release_date >= {now} & first_release_date <= {future} & hypes >= 3;"
-            f" sort first_release_date asc; limit 500; offset {offset};"
-        )
-        page = igdb_post("games", body, client_id, token) or []
-        for g in page:
-            if g["id"] not in seen_ids:
-                games.append(g)
-                seen_ids.add(g["id"])
-        if len(page) < 500:
-            break
-
-    # Get human-readable dates + date_format from release_dates endpoint
-    # date_format: 0=YYYYMMDD (exact day), 1=YYYYMM (month), 2=YYYYQ (quarter), 3=YYYY, 4=TBD
-    rd_map = {}
-    game_ids = [str(g["id"]) for g in games]
-    for batch_start in range(0, len(game_ids), 500):
-        batch = game_ids[batch_start:batch_start + 500]
-        ids_str = ",".join(batch)
-        rd_body = (
-            f"fields game,date,human,platform.name,date_format;"
-            f" where game = ({ids_str});"
-            f" limit 500;"
-        )
-        rd_raw = igdb_post("release_dates", rd_body, client_id, token) or []
-        for entry in rd_raw:
-            gid = entry.get("game")
-            if not gid:
-                continue
-            if gid not in rd_map:
-                rd_map[gid] = {
-                    "human": entry.get("human", ""),
-                    "date_format": entry.get("date_format", 99),
-                    "platforms": []
-                }
-            else:
-                if entry.get("date_format", 99) < rd_map[gid]["date_format"]:
-                    rd_map[gid]["human"] = entry.get("human", "")
-                    rd_map[gid]["date_format"] = entry.get("date_format", 99)
-            if entry.get("platform"):
-                rd_map[gid]["platforms"].append(entry["platform"])
+    future = int((now_dt + timedelta(days=days)).timestamp())
+    games = mirror.games_releasing(now, future, min_hypes=3)
+    release_dates = mirror.release_dates_for(g["id"] for g in games)
 
     results = []
     for g in games:
-        gid = g.get("id")
-        rd = rd_map.get(gid, {})
+        entries = release_dates.get(g["id"], [])
+        # date_format: 0=YYYYMMDD (exact day), 1=YYYYMM (month), 2=YYYYQ (quarter), 3=YYYY, 4=TBD
+        best = min(entries, key=lambda e: 99 if e["date_format"] is None else e["date_format"], default=None)
         ts = g.get("first_release_date")
-        date_fmt = rd.get("date_format", 99)
 
         # Only include games with confirmed exact dates (date_format 0 = YYYYMMDD)
-        if date_fmt != 0:
+        if not best or best["date_format"] != 0:
             continue
 
-        human = rd.get("human", "")
+        human = best["human"]
         if not human and ts:
             human = datetime.fromtimestamp(ts).strftime("%b %d, %Y")
         results.append({
@@ -391,26 +557,20 @@ def fetch_upcoming_releases(client_id, token):
             "total_rating": g.get("total_rating"),
             "date": ts,
             "human": human,
-            "platforms": rd.get("platforms", g.get("platforms", []))
+            "platforms": [e["platform"] for e in entries if e["platform"]],
         })
     # Sort chronologically
     results.sort(key=lambda x: x.get("date") or 0)
     return results
 
-def fetch_just_released(client_id, token):
-    """Games released in the last 7 days via release_dates endpoint."""
+def fetch_just_released(mirror=None):
+    """Games released in the last 7 days (IGDB mirror release dates)."""
+    mirror = mirror or igdb_mirror.get_mirror()
     ago = int((datetime.now() - timedelta(days=7)).timestamp())
     now = int(datetime.now().timestamp())
-    body = (
-        f"fields game.name,game.url,game.follows,game.total_rating,game.rating,date,platform.name,human;"
-        f" where date >= {ago} & date <= {now};"
-        f" sort date desc; limit 50;"
-    )
-    raw = igdb_post("release_dates", body, client_id, token)
     seen = {}
     results = []
-    for entry in raw:
-        game = entry.get("game", {})
+    for entry, game in mirror.released_between(ago, now, limit=50):
         name = game.get("name", "")
         if not name or name in seen:
             if name in seen and entry.get("platform"):
@@ -430,50 +590,50 @@ def fetch_just_released(client_id, token):
         results.append(item)
     return results
 
-def fetch_igdb_popular(client_id, token):
-    """Get most popular upcoming/unreleased games from IGDB popularity primitives."""
-    # Fetch top 50 by want-to-play, then filter to unreleased
-    body = "fields game_id,value,popularity_type; where popularity_type = 7; sort value desc; limit 50;"
-    raw = igdb_post("popularity_primitives", body, client_id, token)
-    if not raw:
-        return []
-
-    game_ids = [str(entry["game_id"]) for entry in raw if "game_id" in entry]
-    if not game_ids:
-        return []
-
-    # Resolve game names — filter to unreleased or future release dates
+def fetch_igdb_popular(mirror=None):
+    """Most popular upcoming/unreleased games from the mirrored IGDB popularity ranking."""
+    mirror = mirror or igdb_mirror.get_mirror()
+    # Top 50 by want-to-play, then filter to unreleased or future release dates
     now = int(datetime.now().timestamp())
-    ids_str = ",".join(game_ids)
-    body2 = (
-        f"fields name,first_release_date,follows,url,platforms.name;"
-        f" where id = ({ids_str}) & (first_release_date > {now} | first_release_date = null);"
-        f" limit 50;"
-    )
-    games = igdb_post("games", body2, client_id, token)
-
-    pop_map = {entry["game_id"]: entry["value"] for entry in raw}
-    for g in games:
-        g["popularity"] = pop_map.get(g["id"], 0)
+    games = [{**g, "popularity": value} for g, value in mirror.popular(limit=50)
+             if g.get("first_release_date") is None or g["first_release_date"] > now]
+    return games[:10]
+
+def match_wishlisted_to_igdb(wishlisted, client_id, auth, igdb=None):
+    """Cross-reference Steam wishlisted games with IGDB for release dates.
+    Names matched on an earlier run are looked up by id (IGDB_MEMO_FILE), the
+    rest searched; all of it goes out as one batch."""
+    igdb = igdb or IgdbBatcher(client_id, auth)
+    fields = "fields name,first_release_date,follows,url,platforms.name;"
+    memo = load_igdb_memo()
+    wanted = wishlisted[:10]
+    known = {memo[g["name"].lower()] for g in wanted if g["name"].lower() in memo}
+    unknown = [g["name"] for g in wanted if g["name"].lower() not in memo]
+    queries = []
+    if known:
+        ids_str = ",".join(str(i) for i in sorted(known))
+        queries.append(("games", f"{fields} where id = ({ids_str}); limit {len(known)};"))
+    for name in unknown:
+        safe_name = name.replace('"', '\\"')
+        queries.append(("games", f'search "{safe_name}"; {fields} limit 1;'))
+    answers = igdb.query_many(queries)
 
-    return sorted(games, key=lambda x: -x.get("popularity", 0))[:10]
+    by_id = {g["id"]: g for g in answers.pop(0)} if known else {}
+    for name, matches in zip(unknown, answers):
+        if matches:
+            memo[name.lower()] = matches[0]["id"]
+            by_id[matches[0]["id"]] = matches[0]
+    if unknown:
+        save_igdb_memo(memo)
 
-def match_wishlisted_to_igdb(wishlisted, client_id, token):
-    """Cross-reference Steam wishlisted games with IGDB for release dates."""
     results = []
-    for game in wishlisted[:10]:
-        name = game["name"]
-        # Search IGDB for this game
-        safe_name = name.replace('"', '\\"')
-        body = f'search "{safe_name}"; fields name,first_release_date,follows,url,platforms.name; limit 1;'
-        matches = igdb_post("games", body, client_id, token)
-        if matches:
-            match = matches[0]
-            match["steam_appid"] = game["appid"]
-            results.append(match)
+    for game in wanted:
+        match = by_id.get(memo.get(game["name"].lower()))
+        if match:
+            results.append({**match, "steam_appid": game["appid"]})
         else:
             results.append({
-                "name": name,
+                "name": game["name"],
                 "steam_appid": game["appid"],
                 "first_release_date": None,
                 "url": "",
@@ -483,67 +643,67 @@ def match_wishlisted_to_igdb(wishlisted, client_id, token):
 
 # ── Report builder ────────────────────────────────────────────────────────────
 
-def build_report(mode="daily"):
+def build_report(mode="daily", sweep=True):
     creds = load_credentials()
     client_id = creds["client_id"]
     client_secret = creds["client_secret"]
-
-    print("Authenticating with Twitch...", file=sys.stderr)
-    token = get_access_token(client_id, client_secret)
+    auth = twitch_auth.TokenStore(client_id, client_secret)
 
     today = datetime.now().strftime("%Y-%m-%d")
     snapshots = load_snapshots()
     prev = get_previous_snapshot(snapshots, today)
-    prev_viewers = prev.get("viewers", {})
-    prev_names = set(prev.get("top_game_names", []))
 
     if mode == "daily":
-        return build_daily_report(client_id, token, today, snapshots, prev_viewers, prev_names)
+        return build_daily_report(client_id, auth, today, snapshots, prev, sweep)
     elif mode == "weekly":
         return build_summary_report(snapshots, today, 7)
     elif mode == "monthly":
         return build_summary_report(snapshots, today, 30)
 
-def build_daily_report(client_id, token, today, snapshots, prev_viewers, prev_names):
+def build_daily_report(client_id, auth, today, snapshots, prev, sweep=True):
     lines = []
     lines.append(f"<b>GAMING TRENDS — {today}</b>")
     lines.append("")
 
     # ── 1. Twitch: Top 5 Most Streamed Games ──
     print("Fetching Twitch top games...", file=sys.stderr)
-    all_games = fetch_top_games(client_id, token, count=50)
-    top15 = enrich_with_streams(client_id, token, all_games, count=15)
-    # Also enrich positions 16-50 for breakout detection
-    top15_ids = {g["id"] for g in all_games[:15]}
-
-    lines.append("<b>TOP 15 MOST STREAMED</b>")
+    directory = TwitchDirectory.fetch(client_id, auth, depth=max(TOP_COUNT, BREAKOUT_DEPTH))
+    stream_stats = None
+    if sweep:
+        print("Sweeping live streams...", file=sys.stderr)
+        stream_stats = sweep_streams(client_id, auth)
+        record_sweep(stream_stats)  # the report is a sample too
+    # Names first, so a previous snapshot stored by name (before ids) still maps onto ids
+    names = twitch_games.get_names()
+    names.update({g["id"]: g["name"] for g in directory.games})
+    prev = twitch_games.day_arrays(prev, names.ids_by_name())
+    top15 = enrich_with_streams(client_id, auth, directory.top(TOP_COUNT), count=TOP_COUNT, sweep=stream_stats)
+
+    lines.append(f"<b>TOP {TOP_COUNT} MOST STREAMED</b>")
     lines.append("")
-    for i, g in enumerate(top15, 1):
+    for i, (g, prev_v) in enumerate(zip(top15, twitch_games.gather(prev, [g["id"] for g in top15])), 1):
         name = g["name"]
         viewers = g["viewers"]
         streams = g["streams"]
-        change = pct_change_str(viewers, prev_viewers.get(name, 0))
+        change = pct_change_str(viewers, prev_v)
         link = twitch_link(name)
         lines.append(f"{i}. {link}")
-        lines.append(f"   {fmt_num(viewers)} viewers · {streams}+ streams{change}")
+        more = "" if g["exact"] else "+"
+        lines.append(f"   {fmt_num(viewers)}{more} viewers · {streams}{more} streams{change}")
     lines.append("")
 
     # ── 2. Breakout Games (surging in viewers/streams) ──
     print("Fetching breakout candidates...", file=sys.stderr)
-    breakout_raw = fetch_breakout_games(client_id, token, top15_ids, count=50)
+    # Ranks 16-50 come from the same directory listing; only stream totals cost requests
+    breakout_raw = fetch_breakout_games(client_id, auth, directory, sweep=stream_stats)
 
-    # Build full viewer map for snapshot
     all_enriched = top15 + breakout_raw
-    current_viewers = {g["name"]: g["viewers"] for g in all_enriched}
-    current_streams = {g["name"]: g["streams"] for g in all_enriched}
 
-    if prev_viewers:
+    if len(prev.ids):
         # Score breakout by: % viewer increase OR high stream count for new entries
         breakout_scored = []
-        for g in breakout_raw:
-            name = g["name"]
+        for g, prev_v in zip(breakout_raw, twitch_games.gather(prev, [g["id"] for g in breakout_raw])):
             curr_v = g["viewers"]
-            prev_v = prev_viewers.get(name, 0)
 
             if prev_v >= 200 and curr_v > prev_v:
                 # Returning game surging
@@ -570,14 +730,15 @@ def build_daily_report(client_id, token, today, snapshots, prev_viewers, prev_na
         for g in breakout_top:
             link = twitch_link(g["name"])
             streams = g["streams"]
-            lines.append(f"  {link} — {g['label']} · {streams}+ streams")
+            more = "" if g["exact"] else "+"
+            lines.append(f"  {link} — {g['label']} · {streams}{more} streams")
         lines.append("")
 
     # ── 3. Top 3 Games by Language ──
     print("Fetching language breakdown...", file=sys.stderr)
     lang_section = []
     for code, lang_name in sorted(TRACKED_LANGUAGES.items(), key=lambda x: x[1]):
-        top3 = fetch_top_by_language(client_id, token, code, limit=3)
+        top3 = fetch_top_by_language(client_id, auth, code, limit=3, sweep=stream_stats)
         if top3:
             games_str = " · ".join(f"{safe_html(n)} ({fmt_num(v)})" for n, v in top3)
             lang_section.append(f"  <b>{lang_name}:</b> {games_str}")
@@ -588,12 +749,23 @@ def build_daily_report(client_id, token, today, snapshots, prev_viewers, prev_na
         lines.extend(lang_section)
         lines.append("")
 
-    # ── 4. Most Wishlisted on Steam → IGDB release dates ──
+    # ── IGDB: wishlist matching and the mirror sync share /multiquery requests; 5-7 are local ──
     print("Fetching Steam wishlisted games...", file=sys.stderr)
     wishlisted = fetch_steam_wishlisted()
+    print("Syncing IGDB mirror and matching wishlist...", file=sys.stderr)
+    igdb = IgdbBatcher(client_id, auth)
+    mirror = igdb_mirror.get_mirror()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        wishlist_igdb = pool.submit(match_wishlisted_to_igdb, wishlisted, client_id, auth, igdb)
+        synced = pool.submit(mirror.sync, igdb)
+    wishlist_igdb = wishlist_igdb.result()
+    print(f"  IGDB mirror: {synced.result()} rows updated", file=sys.stderr)
+    popular = fetch_igdb_popular(mirror)
+    upcoming = fetch_upcoming_releases(mirror)
+    just_released = fetch_just_released(mirror)
+
+    # ── 4. Most Wishlisted on Steam → IGDB release dates ──
     if wishlisted:
-        print("Cross-referencing with IGDB...", file=sys.stderr)
-        wishlist_igdb = match_wishlisted_to_igdb(wishlisted, client_id, token)
         lines.append("<b>MOST WISHLISTED (Steam) + RELEASE DATES</b>")
         lines.append("")
         for i, g in enumerate(wishlist_igdb[:10], 1):
@@ -612,8 +784,6 @@ def build_daily_report(client_id, token, today, snapshots, prev_viewers, prev_na
         lines.append("")
 
     # ── 5. IGDB Most Popular (want-to-play) ──
-    print("Fetching IGDB popularity...", file=sys.stderr)
-    popular = fetch_igdb_popular(client_id, token)
     if popular:
         lines.append("<b>IGDB — MOST WANTED</b>")
         lines.append("")
@@ -630,11 +800,9 @@ def build_daily_report(client_id, token, today, snapshots, prev_viewers, prev_na
             lines.append(f"  {link}{meta_str}")
         lines.append("")
 
-    # ── 6. Upcoming Releases (next 60 days, notable only) ──
-    print("Fetching upcoming releases...", file=sys.stderr)
-    upcoming = fetch_upcoming_releases(client_id, token)
+    # ── 6. Upcoming Releases (next UPCOMING_DAYS, notable only) ──
     if upcoming:
-        lines.append("<b>UPCOMING RELEASES (60 DAYS)</b>")
+        lines.append(f"<b>UPCOMING RELEASES ({UPCOMING_DAYS} DAYS)</b>")
         lines.append("")
         for g in upcoming[:30]:  # Telegram gets top 30
             name = safe_html(g["name"])
@@ -653,7 +821,6 @@ def build_daily_report(client_id, token, today, snapshots, prev_viewers, prev_na
         lines.append("")
 
     # ── 7. Just Released (7 days) ──
-    just_released = fetch_just_released(client_id, token)
     if just_released:
         lines.append("<b>JUST RELEASED (7 DAYS)</b>")
         lines.append("")
@@ -680,10 +847,11 @@ def build_daily_report(client_id, token, today, snapshots, prev_viewers, prev_na
             "hypes": g.get("hypes", 0),
             "igdb_url": g.get("url", ""),
         })
+    # Games by id (names in twitch_games): the ranked listing, then the rest of the sweep
+    swept = sweep_games(stream_stats) if stream_stats else []
+    names.update({gid: stream_stats.names[gid] for gid, _, _ in swept})
     snapshot_data = {
-        "top_game_names": [g["name"] for g in all_enriched[:50]],
-        "viewers": {g["name"]: g["viewers"] for g in all_enriched},
-        "streams": {g["name"]: g["streams"] for g in all_enriched},
+        **twitch_games.pack([(g["id"], g["viewers"], g["streams"]) for g in all_enriched], swept),
         "releasing": releasing_data,
         "date": datetime.now().isoformat()
     }
@@ -707,63 +875,79 @@ def build_summary_report(snapshots, today, days):
     period_name = "WEEKLY" if days <= 7 else "MONTHLY"
     lines = [f"<b>GAMING TRENDS — {period_name} SUMMARY ({days}d)</b>", ""]
 
+    # Joins run on game ids over aligned per-day arrays; names only for display
+    names = twitch_games.get_names()
+    sorted_dates = sorted(period_snaps.keys())
+    period = [twitch_games.day_arrays(period_snaps[d], names.ids_by_name()) for d in sorted_dates]
+
     game_appearances = {}
-    for snap in period_snaps.values():
-        for name in snap.get("top_game_names", []):
-            game_appearances[name] = game_appearances.get(name, 0) + 1
+    for day in period:
+        for gid in day.top:
+            game_appearances[gid] = game_appearances.get(gid, 0) + 1
 
     total_days = len(period_snaps)
     consistent = sorted(game_appearances.items(), key=lambda x: -x[1])[:10]
 
     lines.append(f"<b>MOST CONSISTENT (top games for {total_days} days)</b>")
-    for name, count in consistent:
+    for gid, count in consistent:
         pct = (count / total_days) * 100
-        lines.append(f"  {twitch_link(name)} — {count}/{total_days} days ({pct:.0f}%)")
+        lines.append(f"  {twitch_link(names.name(gid))} — {count}/{total_days} days ({pct:.0f}%)")
     lines.append("")
 
-    sorted_dates = sorted(period_snaps.keys())
-    first_snap = period_snaps[sorted_dates[0]]
-    last_snap = period_snaps[sorted_dates[-1]]
-    first_v = first_snap.get("viewers", {})
-    last_v = last_snap.get("viewers", {})
+    # Sampler rollups (--sample), when there are at least two days with MIN_DAY_SAMPLES:
+    # daily average viewers instead of the single report-time counts, plus hours watched
+    start = datetime.strptime(sorted_dates[0], "%Y-%m-%d").date()
+    period_days = [start + timedelta(days=i) for i in range((datetime.strptime(today, "%Y-%m-%d").date() - start).days + 1)]
+    rollups = viewer_series.get_series().daily(None, period_days, min_samples=viewer_series.MIN_DAY_SAMPLES)
+    axis, viewer_cols, _ = twitch_games.align(period, extra_ids=rollups)
+    first_v, last_v = viewer_cols[0], viewer_cols[-1]
+    sampled = sorted({day for per_day in rollups.values() for day in per_day})
+    if len(sampled) >= 2:
+        first_v, last_v = ([rollups.get(gid, {}).get(day, {}).get("avg", 0) for gid in axis]
+                           for day in (sampled[0], sampled[-1]))
+        watched = []
+        for gid, per_day in rollups.items():
+            watched.append((sum(st["hours_watched"] for st in per_day.values()),
+                            max(st["peak"] for st in per_day.values()), gid))
+        lines.append(f"<b>MOST WATCHED (hours watched, {len(sampled)} sampled days)</b>")
+        for hours, peak, gid in sorted(watched, reverse=True)[:10]:
+            lines.append(f"  {twitch_link(names.name(gid))} — {fmt_num(hours)} hours · peak {fmt_num(peak)}")
+        lines.append("")
 
-    changes = []
-    for name in set(first_v.keys()) & set(last_v.keys()):
-        if first_v[name] >= 500:
-            pct = ((last_v[name] - first_v[name]) / first_v[name]) * 100
-            changes.append((name, last_v[name], first_v[name], pct))
+    changes = [(gid, last, first, ((last - first) / first) * 100)
+               for gid, first, last in zip(axis, first_v, last_v) if first >= 500 and last]
 
     risers = sorted([c for c in changes if c[3] > 10], key=lambda x: -x[3])[:5]
     fallers = sorted([c for c in changes if c[3] < -10], key=lambda x: x[3])[:5]
 
     if risers:
         lines.append(f"<b>BIGGEST RISERS ({days}d)</b>")
-        for name, curr, prev, pct in risers:
-            lines.append(f"  {twitch_link(name)}: {fmt_num(prev)} → {fmt_num(curr)} (+{pct:.0f}%)")
+        for gid, curr, prev, pct in risers:
+            lines.append(f"  {twitch_link(names.name(gid))}: {fmt_num(prev)} → {fmt_num(curr)} (+{pct:.0f}%)")
         lines.append("")
 
     if fallers:
         lines.append(f"<b>BIGGEST FALLERS ({days}d)</b>")
-        for name, curr, prev, pct in fallers:
-            lines.append(f"  {twitch_link(name)}: {fmt_num(prev)} → {fmt_num(curr)} ({pct:.0f}%)")
+        for gid, curr, prev, pct in fallers:
+            lines.append(f"  {twitch_link(names.name(gid))}: {fmt_num(prev)} → {fmt_num(curr)} ({pct:.0f}%)")
         lines.append("")
 
-    first_names = set(first_snap.get("top_game_names", []))
-    last_names = set(last_snap.get("top_game_names", []))
-    new_this_period = last_names - first_names
-    dropped = first_names - last_names
+    first_ids = set(period[0].top)
+    last_ids = set(period[-1].top)
+    new_this_period = last_ids - first_ids
+    dropped = first_ids - last_ids
 
     if new_this_period:
+        last_at = dict(zip(axis, last_v))
         lines.append(f"<b>NEW ENTRIES THIS {period_name}</b>")
-        for name in sorted(new_this_period):
-            viewers = last_v.get(name, 0)
-            lines.append(f"  {twitch_link(name)} — {fmt_num(viewers)} viewers")
+        for gid in sorted(new_this_period, key=names.name):
+            lines.append(f"  {twitch_link(names.name(gid))} — {fmt_num(last_at[gid])} viewers")
         lines.append("")
 
     if dropped:
         lines.append(f"<b>DROPPED OFF THIS {period_name}</b>")
-        for name in sorted(dropped):
-            lines.append(f"  {safe_html(name)}")
+        for gid in sorted(dropped, key=names.name):
+            lines.append(f"  {safe_html(names.name(gid))}")
         lines.append("")
 
     report = "\n".join(lines)
@@ -775,11 +959,16 @@ def build_summary_report(snapshots, today, days):
 # ── CLI ───────────────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
+    if "--sample" in sys.argv:
+        every = float(sys.argv[sys.argv.index("--every") + 1]) if "--every" in sys.argv else 0
+        run_sampler(every)
+        sys.exit(0)
+
     mode = "daily"
     if "--weekly" in sys.argv:
         mode = "weekly"
     elif "--monthly" in sys.argv:
         mode = "monthly"
 
-    report = build_report(mode)
+    report = build_report(mode, sweep="--per-game" not in sys.argv)
     print(report)
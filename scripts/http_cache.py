@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP response cache — used by http_client for cacheable endpoints.
+Entries live in one SQLite file keyed by normalized method + URL + body, expire
+by per-endpoint TTL rules, revalidate with ETag / If-Modified-Since and are
+evicted least-recently-used once the cache grows past MAX_CACHE_BYTES.
+Set HTTP_CACHE_DISABLE=1 to bypass it entirely.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent / "http_cache"
+CACHE_FILE = CACHE_DIR / "responses.sqlite3"
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+EVICT_TO_RATIO = 0.9  # evict down to this share of MAX_CACHE_BYTES
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# (host, path regex, ttl seconds) — first match wins, ttl 0 = never cache.
+# Hosts without a rule (Twitch Helix, Twitch OAuth, Telegram) are never cached.
+TTL_RULES = [
+    ("api.steampowered.com", r"/GetNumberOfCurrentPlayers/", 0),
+    ("store.steampowered.com", r"^/api/appdetails", DAY),
+    ("store.steampowered.com", r"^/appreviews/", HOUR),
+    ("store.steampowered.com", r"^/api/featuredcategories", 30 * 60),
+    ("store.steampowered.com", r"^/search/results", 30 * 60),
+    ("www.cheapshark.com", r"/stores$", 7 * DAY),
+    ("www.cheapshark.com", r"/deals$", HOUR),
+    ("api.igdb.com", r"/popularity_primitives$", 6 * HOUR),
+    ("api.igdb.com", r"/(games|release_dates|platforms)$", DAY),
+    ("api.igdb.com", r"/multiquery$", 6 * HOUR),  # mixed sub-queries: shortest TTL of the above
+    ("store-site-backend-static-ipv4.ak.epicgames.com", r"/freeGamesPromotions", HOUR),
+]
+
+# (host, path regex, query regex, ttl) — checked before TTL_RULES, for endpoints
+# whose volatility depends on the query (appdetails: prices vs. static fields)
+QUERY_TTL_RULES = [
+    ("store.steampowered.com", r"^/api/appdetails", r"(^|&)filters=price_overview(&|$)", HOUR),
+    ("store.steampowered.com", r"^/api/appdetails", r"(^|&)filters=basic%2Cgenres%2Crelease_date(&|$)", 7 * DAY),
+    ("store.steampowered.com", r"^/appreviews/", r"(^|&)filter=recent(&|$)", 0),  # review_tracker pages
+]
+
+# Response headers worth keeping with a cached body
+_KEEP_HEADERS = ("content-type", "etag", "last-modified", "date")
+
+
+def enabled():
+    return os.environ.get("HTTP_CACHE_DISABLE", "") not in ("1", "true", "yes")
+
+
+def ttl_for(url):
+    parts = urllib.parse.urlsplit(url)
+    for host, pattern, query, ttl in QUERY_TTL_RULES:
+        if parts.hostname == host and re.search(pattern, parts.path) and re.search(query, parts.query):
+            return ttl
+    for host, pattern, ttl in TTL_RULES:
+        if parts.hostname == host and re.search(pattern, parts.path):
+            return ttl
+    return 0
+
+
+def normalize_url(url):
+    """Lower-case scheme/host and sort query params so equivalent URLs share a key."""
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)))
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ""))
+
+
+def cache_key(method, url, body=None):
+    h = hashlib.sha256()
+    h.update(method.upper().encode())
+    h.update(b"\0")
+    h.update(normalize_url(url).encode())
+    h.update(b"\0")
+    if body:
+        h.update(body if isinstance(body, bytes) else str(body).encode("utf-8"))
+    return h.hexdigest()
+
+
+class CacheEntry:
+    __slots__ = ("key", "status", "headers", "body", "expires_at")
+
+    def __init__(self, key, status, headers, body, expires_at):
+        self.key = key
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+    def conditional_headers(self):
+        headers = {}
+        if self.headers.get("etag"):
+            headers["If-None-Match"] = self.headers["etag"]
+        if self.headers.get("last-modified"):
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_FILE, max_bytes=MAX_CACHE_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self._db = None
+        self._total = None  # running byte total; summed once, then kept up to date by put/_evict
+
+    def _conn(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, body BLOB,"
+                " size INTEGER, stored_at REAL, expires_at REAL, last_access REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+            self._db = db
+        return self._db
+
+    def get(self, key):
+        """Return the entry for key (fresh or stale) or None, and mark it recently used."""
+        with self.lock:
+            db = self._conn()
+            row = db.execute(
+                "SELECT status, headers, body, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+        status, headers, body, expires_at = row
+        return CacheEntry(key, status, json.loads(headers), bytes(body), expires_at)
+
+    def put(self, key, url, status, headers, body, ttl):
+        kept = {k: v for k, v in headers.items() if k in _KEEP_HEADERS}
+        now = time.time()
+        with self.lock:
+            db = self._conn()
+            if self._total is None:
+                self._total = self._sum(db)
+            old = db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(kept), body, len(body), now, now + ttl, now),
+            )
+            self._total += len(body) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict(db)
+            db.commit()
+
+    def refresh(self, key, ttl):
+        """Extend a stale entry after a 304 Not Modified."""
+        now = time.time()
+        with self.lock:
+            db = self._conn()
+            db.execute("UPDATE entries SET expires_at = ?, last_access = ? WHERE key = ?",
+                       (now + ttl, now, key))
+            db.commit()
+
+    @staticmethod
+    def _sum(db):
+        return db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self, db):
+        """Delete least-recently-used entries down to EVICT_TO_RATIO of the cap. Only called
+        once the running total passes the cap; re-summed here since other processes share the file."""
+        total = self._sum(db)
+        target = self.max_bytes * EVICT_TO_RATIO
+        while total > target:
+            oldest = db.execute("SELECT key, size FROM entries ORDER BY last_access LIMIT 500").fetchall()
+            if not oldest:
+                break
+            for key, size in oldest:
+                if total <= target:
+                    break
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+        self._total = total
+
+    def clear(self):
+        with self.lock:
+            db = self._conn()
+            db.execute("DELETE FROM entries")
+            db.commit()
+            self._total = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
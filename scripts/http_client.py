@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Shared pooled HTTP client — used by all report fetchers.
+Keeps a keep-alive connection pool per host so the daily run reuses TCP/TLS
+connections instead of handshaking on every call. Decodes gzip/deflate bodies,
+applies one default timeout and raises a single HttpError type. Every request
+is paced by rate_limiter's per-host token buckets, and cacheable endpoints
+are served from http_cache, failures go through resilience's retry/backoff
+and per-host circuit breaker, and cassette can record or replay every call.
+"""
+
+import gzip
+import http.client
+import json
+import os
+import ssl
+import sys
+import threading
+import urllib.parse
+import zlib
+
+import cassette
+import http_cache
+import rate_limiter
+import resilience
+
+DEFAULT_TIMEOUT = 30
+MAX_IDLE_PER_HOST = 8
+MAX_REDIRECTS = 5
+MAX_RATE_LIMIT_RETRIES = 3  # re-sends after a 429 once the host's pause has passed
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# POSTs that are safe to repeat (read-only queries / token grants)
+IDEMPOTENT_POST_HOSTS = {"api.igdb.com", "id.twitch.tv"}
+USER_AGENT = "OGGamingDashboard/1.0"
+
+# Upstream base URL overrides, e.g. to load-test against mock_upstreams.py.
+# UPSTREAM_BASE_URL routes every host to <base>/<host>/<path>; UPSTREAM_OVERRIDES
+# is a JSON {"host": "base_url"} map for individual hosts (takes precedence).
+UPSTREAM_BASE_URL = os.environ.get("UPSTREAM_BASE_URL", "").rstrip("/")
+UPSTREAM_OVERRIDES = json.loads(os.environ.get("UPSTREAM_OVERRIDES", "") or "{}")
+
+_SSL_CONTEXT = ssl.create_default_context()
+
+# Errors that mean a pooled keep-alive connection went stale before we got a response
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+class HttpError(Exception):
+    """Raised for network failures (status None) and HTTP status >= 400."""
+
+    def __init__(self, message, status=None, url="", headers=None, body=b""):
+        super().__init__(message)
+        self.status = status
+        self.url = url
+        self.headers = headers or {}
+        self.body = body
+
+
+class Response:
+    __slots__ = ("status", "headers", "body", "url")
+
+    def __init__(self, status, headers, body, url):
+        self.status = status
+        self.headers = headers  # lower-cased header name -> value
+        self.body = body
+        self.url = url
+
+    def json(self):
+        if not self.body:
+            return None
+        return json.loads(self.body)
+
+    def text(self):
+        return self.body.decode("utf-8", errors="replace")
+
+
+# ── Connection pool ──────────────────────────────────────────────────────────
+
+class _HostPool:
+    """Idle keep-alive connections for one (scheme, host, port)."""
+
+    def __init__(self, scheme, host, port):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout):
+        with self.lock:
+            if self.idle:
+                conn = self.idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=timeout, context=_SSL_CONTEXT)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        return conn, False
+
+    def release(self, conn):
+        with self.lock:
+            if len(self.idle) < MAX_IDLE_PER_HOST:
+                self.idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self.lock:
+            conns, self.idle = self.idle, []
+        for conn in conns:
+            conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(scheme, host, port):
+    key = (scheme, host, port)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = _HostPool(scheme, host, port)
+        return pool
+
+
+def close_all():
+    """Close every pooled connection (safe to call at process exit)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+
+
+# ── Request helpers ──────────────────────────────────────────────────────────
+
+def resolve_url(url):
+    """Apply UPSTREAM_OVERRIDES / UPSTREAM_BASE_URL to a real upstream URL."""
+    if not UPSTREAM_BASE_URL and not UPSTREAM_OVERRIDES:
+        return url
+    parts = urllib.parse.urlsplit(url)
+    rest = parts.path + ("?" + parts.query if parts.query else "")
+    base = UPSTREAM_OVERRIDES.get(parts.hostname)
+    if base:
+        return base.rstrip("/") + rest
+    if UPSTREAM_BASE_URL and parts.hostname not in ("127.0.0.1", "localhost"):
+        return f"{UPSTREAM_BASE_URL}/{parts.hostname}{rest}"
+    return url
+
+
+def credentials_optional():
+    """True when no real upstream will see our credentials (cassette replay or overridden hosts)."""
+    return cassette.replaying() or bool(UPSTREAM_BASE_URL or UPSTREAM_OVERRIDES)
+
+
+def build_url(url, params=None):
+    if params:
+        sep = "&" if "?" in url else "?"
+        url = url + sep + urllib.parse.urlencode(params)
+    return url
+
+
+def _decode_body(body, encoding):
+    encoding = (encoding or "").lower()
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some servers send raw deflate without the zlib header
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+def _send_once(method, url, body, headers, timeout):
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme or "https"
+    port = parts.port or (443 if scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    pool = _get_pool(scheme, parts.hostname, port)
+
+    # A reused connection may have been closed by the server while idle;
+    # retry exactly once on a fresh connection in that case.
+    for attempt in range(2):
+        conn, reused = pool.acquire(timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            raw = resp.read()
+        except _STALE_ERRORS as e:
+            conn.close()
+            if reused and attempt == 0:
+                continue
+            raise HttpError(f"{type(e).__name__}: {e}", url=url) from e
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise HttpError(f"{type(e).__name__}: {e}", url=url) from e
+
+        resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+        if resp.will_close:
+            conn.close()
+        else:
+            pool.release(conn)
+        try:
+            raw = _decode_body(raw, resp_headers.get("content-encoding"))
+        except (OSError, zlib.error) as e:
+            raise HttpError(f"Bad {resp_headers.get('content-encoding')} body: {e}",
+                            status=resp.status, url=url) from e
+        return Response(resp.status, resp_headers, raw, url)
+
+
+def _send(method, url, body, headers, timeout, hedge_after=None):
+    """Send with rate limiting, 429 handling and redirects; no caching.
+    Rate limits are tracked per real upstream host even when it is overridden.
+    With hedge_after, each send is hedged (resilience.hedged) once its rate-limit
+    token is in hand, so queueing for a token never triggers a hedge; the hedge
+    only goes out if a second token is free right away."""
+    redirects = 0
+    rate_limited = 0
+    while True:
+        host = urllib.parse.urlsplit(url).hostname
+        rate_limiter.acquire(host)
+        target = resolve_url(url)
+        if hedge_after:
+            resp = resilience.hedged(lambda: _send_once(method, target, body, headers, timeout), hedge_after,
+                                     may_hedge=lambda: rate_limiter.try_acquire(host))
+        else:
+            resp = _send_once(method, target, body, headers, timeout)
+        rate_limiter.observe(host, resp.status, resp.headers)
+        if resp.status == 429 and rate_limited < MAX_RATE_LIMIT_RETRIES:
+            rate_limited += 1
+            continue
+        if resp.status in (301, 302, 303, 307, 308) and resp.headers.get("location"):
+            redirects += 1
+            if redirects > MAX_REDIRECTS:
+                raise HttpError(f"Too many redirects ({MAX_REDIRECTS})", url=url)
+            url = urllib.parse.urljoin(url, resp.headers["location"])
+            if resp.status == 303 or (resp.status in (301, 302) and method == "POST"):
+                method, body = "GET", None
+                headers.pop("Content-Type", None)
+            continue
+        if resp.status >= 400:
+            raise HttpError(f"HTTP Error {resp.status}", status=resp.status, url=url,
+                            headers=resp.headers, body=resp.body)
+        return resp
+
+
+def _is_retryable(error):
+    return isinstance(error, HttpError) and (error.status is None or error.status in RETRYABLE_STATUSES)
+
+
+def _send_resilient(method, url, body, headers, timeout, retries, hedge):
+    """_send under the host's circuit breaker, with backoff retries and optional hedging."""
+    host = urllib.parse.urlsplit(url).hostname
+    if retries is None:
+        idempotent = method in ("GET", "HEAD") or host in IDEMPOTENT_POST_HOSTS
+        retries = resilience.MAX_RETRIES if idempotent else 0
+    hedge_after = None
+    if method == "GET" and hedge is not False:
+        hedge_after = resilience.HEDGE_AFTER.get(host) if hedge in (None, True) else hedge
+    try:
+        return resilience.call(host, lambda: _send(method, url, body, dict(headers), timeout, hedge_after),
+                               retries=retries, retryable=_is_retryable)
+    except resilience.CircuitOpen as e:
+        raise HttpError(str(e), url=url) from e
+
+
+def request(method, url, params=None, data=None, headers=None, timeout=DEFAULT_TIMEOUT,
+            cache=True, retries=None, hedge=None):
+    """Send a request through the shared pool and return a Response.
+
+    data may be bytes, str (sent as UTF-8) or a dict (form-encoded).
+    Follows redirects, waits out 429s (Retry-After) and raises HttpError on
+    network errors or status >= 400. Endpoints with an http_cache TTL rule are
+    served from the disk cache while fresh and revalidated once stale;
+    pass cache=False to always go to the network. Network errors and 429/5xx
+    are retried with backoff (GETs and IDEMPOTENT_POST_HOSTS by default, or
+    `retries` times) under a per-host circuit breaker; GETs to hosts in
+    resilience.HEDGE_AFTER are hedged (hedge=False disables, a number sets the
+    delay). In cassette record/replay mode the exchange is captured or served
+    from the cassette instead.
+    """
+    url = build_url(url, params)
+    send_headers = {
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    }
+    if headers:
+        send_headers.update(headers)
+
+    body = data
+    if isinstance(data, dict):
+        body = urllib.parse.urlencode(data).encode("utf-8")
+    elif isinstance(data, str):
+        body = data.encode("utf-8")
+    if body is not None:
+        send_headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+
+    if cassette.mode() == "off":
+        return _request_cached(method, url, body, send_headers, timeout, cache, retries, hedge)
+    if cassette.replaying():
+        return _replay(method, url, body)
+    try:
+        resp = _request_cached(method, url, body, send_headers, timeout, cache, retries, hedge)
+    except HttpError as e:
+        cassette.record_http(method, url, body, e.status, e.headers, e.body, error=str(e))
+        raise
+    cassette.record_http(method, url, body, resp.status, resp.headers, resp.body)
+    return resp
+
+
+def _replay(method, url, body):
+    recorded = cassette.replay_http(method, url, body)
+    if recorded is None:
+        raise HttpError(f"No recorded response for {method} {cassette.redact_url(url)}", url=url)
+    status, headers, resp_body, error = recorded
+    if error:
+        raise HttpError(error, status=status, url=url, headers=headers, body=resp_body)
+    return Response(status, headers, resp_body, url)
+
+
+def _request_cached(method, url, body, send_headers, timeout, cache, retries, hedge):
+    ttl = http_cache.ttl_for(url) if cache and http_cache.enabled() else 0
+    if ttl <= 0:
+        return _send_resilient(method, url, body, send_headers, timeout, retries, hedge)
+
+    store = http_cache.get_cache()
+    key = http_cache.cache_key(method, url, body)
+    entry = store.get(key)
+    if entry is not None:
+        if entry.fresh:
+            return Response(entry.status, entry.headers, entry.body, url)
+        send_headers.update(entry.conditional_headers())
+
+    resp = _send_resilient(method, url, body, send_headers, timeout, retries, hedge)
+    if resp.status == 304 and entry is not None:
+        store.refresh(key, ttl)
+        return Response(entry.status, entry.headers, entry.body, url)
+    if resp.status == 200 and "no-store" not in resp.headers.get("cache-control", ""):
+        store.put(key, url, resp.status, resp.headers, resp.body, ttl)
+    return resp
+
+
+def get_json(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT):
+    """GET and decode JSON; raises HttpError or ValueError."""
+    send_headers = {"Accept": "application/json"}
+    if headers:
+        send_headers.update(headers)
+    return request("GET", url, params=params, headers=send_headers, timeout=timeout).json()
+
+
+def post_json(url, data, headers=None, timeout=DEFAULT_TIMEOUT, retries=None):
+    """POST a body and decode the JSON response; raises HttpError or ValueError."""
+    send_headers = {"Accept": "application/json"}
+    if headers:
+        send_headers.update(headers)
+    return request("POST", url, data=data, headers=send_headers, timeout=timeout,
+                   retries=retries).json()
+
+
+def fetch_json(url, params=None, headers=None, default=None, label="API",
+               method="GET", data=None, timeout=DEFAULT_TIMEOUT):
+    """Like get_json/post_json but logs failures and returns `default` instead of raising."""
+    try:
+        if method == "POST":
+            result = post_json(url, data, headers=headers, timeout=timeout)
+        else:
+            result = get_json(url, params=params, headers=headers, timeout=timeout)
+    except (HttpError, ValueError) as e:
+        print(f"  {label} error: {e}", file=sys.stderr)
+        return default
+    return default if result is None else result
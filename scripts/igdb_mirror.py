@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Local IGDB mirror — games, release dates, platforms and popularity in SQLite,
+so gaming_trends answers its upcoming / just released / most wanted sections
+with indexed date-range queries instead of re-querying IGDB every run.
+
+The first sync loads games and release dates dated from MIRROR_PAST_DAYS ago
+onwards. Later syncs only ask for rows whose updated_at is past the previous
+sync (same date floor, so a game delayed beyond any report window is still
+seen) and upsert them. Popularity is a short ranking, so its top
+POPULARITY_DEPTH rows are replaced on every sync. Games referenced by release
+dates or the ranking but not mirrored yet are fetched by id.
+
+IGDB calls go through a batcher with query_many() (gaming_trends.IgdbBatcher):
+each sync round is one set of sub-queries sharing /multiquery requests.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import cassette
+
+MIRROR_FILE = Path(__file__).parent / "gaming_trends_data" / "igdb_mirror.sqlite3"
+MIRROR_PAST_DAYS = 30
+PAGE_SIZE = 500              # IGDB maximum per query
+SYNC_PAGES = 40              # per table per sync; the rest is picked up next run
+POPULARITY_TYPE = 7          # "want to play"
+POPULARITY_DEPTH = 200
+SKEW_MARGIN = 3600           # re-read this much before the watermark (clock skew, ties)
+
+GAME_FIELDS = "name,url,hypes,follows,total_rating,rating,first_release_date,platforms.name,updated_at"
+RELEASE_FIELDS = "game,date,human,date_format,platform.name,updated_at"
+
+
+class IgdbMirror:
+    def __init__(self, path=MIRROR_FILE):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self._db = None
+
+    def _conn(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(
+                "CREATE TABLE IF NOT EXISTS games ("
+                " id INTEGER PRIMARY KEY, name TEXT, url TEXT, hypes INTEGER, follows INTEGER,"
+                " total_rating REAL, rating REAL, first_release_date INTEGER, platforms TEXT, updated_at INTEGER);"
+                "CREATE INDEX IF NOT EXISTS games_release ON games (first_release_date);"
+                "CREATE TABLE IF NOT EXISTS release_dates ("
+                " id INTEGER PRIMARY KEY, game INTEGER, date INTEGER, human TEXT, date_format INTEGER,"
+                " platform_id INTEGER, platform_name TEXT, updated_at INTEGER);"
+                "CREATE INDEX IF NOT EXISTS release_dates_date ON release_dates (date);"
+                "CREATE INDEX IF NOT EXISTS release_dates_game ON release_dates (game);"
+                "CREATE TABLE IF NOT EXISTS platforms (id INTEGER PRIMARY KEY, name TEXT, updated_at INTEGER);"
+                "CREATE TABLE IF NOT EXISTS popularity (game_id INTEGER PRIMARY KEY, value REAL);"
+                "CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value INTEGER);"
+            )
+            self._db = db
+        return self._db
+
+    # ── Sync ─────────────────────────────────────────────────────────────────
+
+    def watermark(self, table):
+        with self.lock:
+            row = self._conn().execute("SELECT value FROM sync_state WHERE name = ?", (table,)).fetchone()
+        return row[0] if row else None
+
+    def sync(self, igdb, now=None):
+        """Pull everything changed since the last sync. Returns {table: rows upserted}."""
+        # The clock and watermarks go through the cassette, so a replayed sync sends the recorded queries
+        now, since = cassette.through("igdb_mirror.sync", {}, lambda: [
+            int(now or time.time()), {t: self.watermark(t) for t in ("games", "release_dates", "platforms")}])
+        floor = now - MIRROR_PAST_DAYS * 86400
+
+        def where(table, date_filter):
+            if since[table] is None:
+                return date_filter
+            changed = f"updated_at > {since[table] - SKEW_MARGIN}"
+            return f"{changed} & ({date_filter})" if date_filter else changed
+
+        tables = {
+            "games": ("games", GAME_FIELDS, where("games", f"first_release_date >= {floor}"), self.put_games),
+            "release_dates": ("release_dates", RELEASE_FIELDS,
+                              where("release_dates", f"date >= {floor} | date = null"), self.put_release_dates),
+            "platforms": ("platforms", "name,updated_at", where("platforms", ""), self.put_platforms),
+        }
+        counts = {t: 0 for t in tables}
+        latest = {t: since[t] or 0 for t in tables}
+        complete = set()
+        offset = 0
+        popularity_query = ("popularity_primitives",
+                            f"fields game_id,value; where popularity_type = {POPULARITY_TYPE};"
+                            f" sort value desc; limit {POPULARITY_DEPTH};")
+        for page in range(SYNC_PAGES):
+            active = [t for t in tables if t not in complete]
+            if not active:
+                break
+            queries = []
+            for t in active:
+                endpoint, fields, condition, _ = tables[t]
+                where_clause = f" where {condition};" if condition else ""
+                queries.append((endpoint, f"fields {fields};{where_clause} sort updated_at asc;"
+                                          f" limit {PAGE_SIZE}; offset {offset};"))
+            if page == 0:
+                queries.append(popularity_query)
+            results = igdb.query_many(queries)
+            if page == 0:
+                ranking = results.pop()
+                if ranking:
+                    self.put_popularity(ranking)
+            for t, rows in zip(active, results):
+                tables[t][3](rows)
+                counts[t] += len(rows)
+                latest[t] = max([latest[t]] + [r.get("updated_at") or 0 for r in rows])
+                if len(rows) < PAGE_SIZE:
+                    complete.add(t)
+            offset += PAGE_SIZE
+
+        # A table cut short by SYNC_PAGES resumes from where it got to (rows are sorted by updated_at)
+        with self.lock:
+            db = self._conn()
+            for t in tables:
+                mark = now if since[t] is None and t in complete else latest[t]
+                if mark:
+                    db.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (t, mark))
+            db.commit()
+
+        missing = self.missing_games(floor)
+        if missing:
+            chunks = [missing[i:i + PAGE_SIZE] for i in range(0, len(missing), PAGE_SIZE)]
+            for rows in igdb.query_many([("games", f"fields {GAME_FIELDS}; where id = ({','.join(map(str, c))});"
+                                                    f" limit {PAGE_SIZE};") for c in chunks]):
+                self.put_games(rows)
+                counts["games"] += len(rows)
+        return counts
+
+    def missing_games(self, floor):
+        """Ids referenced by mirrored release dates (from `floor` on) or the popularity ranking
+        that have no games row."""
+        with self.lock:
+            rows = self._conn().execute(
+                "SELECT game FROM release_dates WHERE date >= ? AND game NOT IN (SELECT id FROM games)"
+                " UNION SELECT game_id FROM popularity WHERE game_id NOT IN (SELECT id FROM games)",
+                (floor,),
+            ).fetchall()
+        return sorted(r[0] for r in rows if r[0])
+
+    # ── Upserts ──────────────────────────────────────────────────────────────
+
+    def put_games(self, games):
+        rows = [(g["id"], g.get("name", ""), g.get("url", ""), g.get("hypes") or 0, g.get("follows") or 0,
+                 g.get("total_rating"), g.get("rating"), g.get("first_release_date"),
+                 json.dumps([{"id": p.get("id"), "name": p.get("name", "")} for p in g.get("platforms", [])
+                             if isinstance(p, dict)]),
+                 g.get("updated_at") or 0)
+                for g in games if g.get("id")]
+        self._upsert("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def put_release_dates(self, entries):
+        rows = []
+        for rd in entries:
+            platform = rd.get("platform") if isinstance(rd.get("platform"), dict) else {}
+            game = rd.get("game")
+            rows.append((rd["id"], game.get("id") if isinstance(game, dict) else game, rd.get("date"),
+                         rd.get("human", ""), rd.get("date_format", 99), platform.get("id"),
+                         platform.get("name", ""), rd.get("updated_at") or 0))
+        self._upsert("INSERT OR REPLACE INTO release_dates VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def put_platforms(self, platforms):
+        self._upsert("INSERT OR REPLACE INTO platforms VALUES (?, ?, ?)",
+                     [(p["id"], p.get("name", ""), p.get("updated_at") or 0) for p in platforms if p.get("id")])
+
+    def put_popularity(self, ranking):
+        """Replace the ranking with [{"game_id", "value"}, ...]."""
+        with self.lock:
+            db = self._conn()
+            db.execute("DELETE FROM popularity")
+            db.executemany("INSERT OR REPLACE INTO popularity VALUES (?, ?)",
+                           [(r["game_id"], r.get("value", 0)) for r in ranking if r.get("game_id")])
+            db.commit()
+
+    def _upsert(self, sql, rows):
+        if not rows:
+            return
+        with self.lock:
+            db = self._conn()
+            db.executemany(sql, rows)
+            db.commit()
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _game(row):
+        gid, name, url, hypes, follows, total_rating, rating, first_release, platforms, _ = row
+        return {"id": gid, "name": name, "url": url, "hypes": hypes, "follows": follows,
+                "total_rating": total_rating, "rating": rating, "first_release_date": first_release,
+                "platforms": json.loads(platforms or "[]")}
+
+    def games_releasing(self, start, end, min_hypes=0):
+        """Games with first_release_date in [start, end] and at least min_hypes, by date."""
+        with self.lock:
+            rows = self._conn().execute(
+                "SELECT * FROM games WHERE first_release_date BETWEEN ? AND ? AND hypes >= ?"
+                " ORDER BY first_release_date, id",
+                (start, end, min_hypes),
+            ).fetchall()
+        return [self._game(r) for r in rows]
+
+    def release_dates_for(self, game_ids):
+        """{game id: [{"date", "human", "date_format", "platform"}, ...]}."""
+        game_ids = list(game_ids)
+        result = {}
+        with self.lock:
+            db = self._conn()
+            for i in range(0, len(game_ids), 500):
+                chunk = game_ids[i:i + 500]
+                for game, date, human, date_format, pid, pname in db.execute(
+                    "SELECT game, date, human, date_format, platform_id, platform_name FROM release_dates"
+                    f" WHERE game IN ({','.join('?' * len(chunk))}) ORDER BY id", chunk
+                ):
+                    result.setdefault(game, []).append({
+                        "date": date, "human": human, "date_format": date_format,
+                        "platform": {"id": pid, "name": pname} if pname else None,
+                    })
+        return result
+
+    def released_between(self, start, end, limit=50):
+        """Release dates in [start, end], newest first, each with its game:
+        [({"date", "human", "platform"}, game), ...]."""
+        with self.lock:
+            rows = self._conn().execute(
+                "SELECT r.date, r.human, r.platform_id, r.platform_name, g.* FROM release_dates r"
+                " JOIN games g ON g.id = r.game WHERE r.date BETWEEN ? AND ? ORDER BY r.date DESC, r.id LIMIT ?",
+                (start, end, limit),
+            ).fetchall()
+        return [({"date": date, "human": human, "platform": {"id": pid, "name": pname} if pname else None},
+                 self._game(rest))
+                for date, human, pid, pname, *rest in rows]
+
+    def popular(self, limit=50):
+        """[(game, popularity value), ...] from the mirrored ranking, highest first."""
+        with self.lock:
+            rows = self._conn().execute(
+                "SELECT p.value, g.* FROM popularity p JOIN games g ON g.id = p.game_id"
+                " ORDER BY p.value DESC LIMIT ?", (limit,),
+            ).fetchall()
+        return [(self._game(rest), value) for value, *rest in rows]
+
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror():
+    global _mirror
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = IgdbMirror()
+        return _mirror
@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for every upstream the reports call — for load tests and
+benchmarking concurrency / rate-limiting changes without touching live APIs.
+
+Serves the endpoint shapes the scripts consume, under a /<real-host>/ prefix:
+  Steam store   /search/results/, /api/appdetails/, /api/featuredcategories/, /appreviews/<appid>
+  Steam Web API /ISteamUserStats/GetNumberOfCurrentPlayers/v1/,
+                /ISteamChartsService/GetGamesByConcurrentPlayers/v1/
+  Twitch        id.twitch.tv /oauth2/token, Helix games/top and streams
+  IGDB          games, release_dates, popularity_primitives, multiquery (Apicalypse bodies)
+  CheapShark    deals, stores
+  Epic          freeGamesPromotions
+  Telegram      bot<token>/sendMessage
+
+Usage:
+  python mock_upstreams.py --port 8765 --latency 120 --jitter 40 --games 5000 --streams 10000
+  set UPSTREAM_BASE_URL=http://127.0.0.1:8765 && set HTTP_CACHE_DISABLE=1 && python steam_trending.py
+
+--error-rate injects 500s, --rate-limit N caps each host at N requests per
+--rate-window seconds (Twitch-style Ratelimit-* headers on every response,
+429 + Retry-After once exhausted).
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GENRES = ["Action", "Adventure", "RPG", "Strategy", "Simulation", "Indie", "Casual",
+          "Sports", "Racing", "Early Access", "Massively Multiplayer"]
+LANGUAGES = ["en", "es", "pt", "ja", "ko", "fr", "de", "ru", "zh", "tr", "ar", "it"]
+PLATFORMS = [{"id": 6, "name": "PC (Microsoft Windows)"}, {"id": 167, "name": "PlayStation 5"},
+             {"id": 169, "name": "Xbox Series X|S"}, {"id": 130, "name": "Nintendo Switch"}]
+REVIEW_DESCS = ["Overwhelmingly Positive", "Very Positive", "Mostly Positive", "Mixed", "Mostly Negative"]
+
+
+# ── Synthetic catalog ────────────────────────────────────────────────────────
+
+class Catalog:
+    """Deterministic fake data sized by --games / --streams."""
+
+    def __init__(self, n_games, n_streams, seed):
+        rng = random.Random(seed)
+        now = datetime.now()
+        self.steam = []
+        for i in range(n_games):
+            appid = str(100000 + i * 10)
+            coming_soon = rng.random() < 0.1
+            is_free = not coming_soon and rng.random() < 0.15
+            release = now + timedelta(days=rng.randint(1, 120)) if coming_soon else now - timedelta(days=rng.randint(0, 2000))
+            price = 0 if is_free else rng.choice([499, 999, 1499, 1999, 2999, 3999, 5999, 6999])
+            discount = rng.choice([0, 0, 0, 10, 25, 50, 75])
+            positive = rng.randint(0, 200000)
+            self.steam.append({
+                "appid": appid,
+                "name": f"Steam Game {i + 1}",
+                "type": "game" if rng.random() > 0.05 else rng.choice(["dlc", "demo"]),
+                "genres": rng.sample(GENRES, 2),
+                "coming_soon": coming_soon,
+                "release_date": release.strftime("%d %b, %Y"),
+                "is_free": is_free,
+                "price": price,
+                "discount": discount,
+                "players": int(900000 / (i + 1) ** 0.9),
+                "positive": positive,
+                "negative": rng.randint(0, positive // 3 + 1),
+                "review_desc": rng.choice(REVIEW_DESCS),
+                "wishlist_rank": rng.random(),
+            })
+        self.steam_by_id = {g["appid"]: g for g in self.steam}
+        # Reviews are a steady stream per app starting 30 days before today
+        self.review_epoch = int(time.time()) // 86400 * 86400 - 30 * 86400
+
+        self.twitch_games = [{"id": str(500000 + i), "name": f"Twitch Game {i + 1}",
+                              "box_art_url": "", "igdb_id": str(1000 + i)}
+                             for i in range(max(n_games // 10, 60))]
+        # Streams are already sorted by viewers (desc); popular games get more streams
+        self.streams = []
+        weights = [1 / (i + 1) for i in range(len(self.twitch_games))]
+        for i in range(n_streams):
+            game = rng.choices(self.twitch_games, weights=weights)[0]
+            self.streams.append({
+                "id": str(9000000 + i),
+                "user_name": f"streamer{i}",
+                "game_id": game["id"],
+                "game_name": game["name"],
+                "type": "live",
+                "viewer_count": max(int(60000 / (i + 1) ** 0.85), 0),
+                "language": rng.choices(LANGUAGES, weights=[40, 12, 8, 6, 5, 4, 4, 6, 3, 3, 2, 2])[0],
+            })
+
+        self.igdb = []
+        for i in range(min(n_games, 3000)):
+            ts = int((now + timedelta(days=rng.randint(-10, 180), hours=rng.randint(0, 23))).timestamp())
+            self.igdb.append({
+                "id": 1000 + i,
+                "name": f"IGDB Game {i + 1}",
+                "url": f"https://www.igdb.com/games/igdb-game-{i + 1}",
+                "hypes": rng.randint(0, 300),
+                "follows": rng.randint(0, 5000),
+                "total_rating": rng.choice([None, rng.uniform(50, 95)]),
+                "first_release_date": ts,
+                "platforms": rng.sample(PLATFORMS, rng.randint(1, 3)),
+                "updated_at": int(now.timestamp()) - rng.randint(0, 86400 * 30),
+            })
+        self.igdb_by_id = {g["id"]: g for g in self.igdb}
+
+
+# ── Request handler ──────────────────────────────────────────────────────────
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockUpstreams/1.0"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    # Plumbing
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _split(self):
+        parts = urllib.parse.urlsplit(self.path)
+        segments = parts.path.lstrip("/").split("/", 1)
+        host = segments[0]
+        path = "/" + (segments[1] if len(segments) > 1 else "")
+        params = dict(urllib.parse.parse_qsl(parts.query, keep_blank_values=True))
+        return host, path, params
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length).decode("utf-8") if length else ""
+
+    def _gate(self, host):
+        """Latency, error and rate-limit injection. Returns (proceed, extra_headers)."""
+        srv = self.server
+        if srv.latency or srv.jitter:
+            time.sleep(max(srv.latency + random.uniform(-srv.jitter, srv.jitter), 0) / 1000)
+        headers = {}
+        if srv.rate_limit:
+            remaining, reset = srv.take_token(host)
+            headers = {"Ratelimit-Limit": str(srv.rate_limit),
+                       "Ratelimit-Remaining": str(max(remaining, 0)),
+                       "Ratelimit-Reset": str(int(reset))}
+            if remaining < 0:
+                headers["Retry-After"] = str(max(int(reset - time.time()) + 1, 1))
+                self._send_json({"error": "Too Many Requests", "status": 429}, 429, headers)
+                return False, headers
+        if srv.error_rate and random.random() < srv.error_rate:
+            self._send_json({"error": "Injected failure", "status": 500}, 500, headers)
+            return False, headers
+        return True, headers
+
+    def do_GET(self):
+        self._dispatch("GET", "")
+
+    def do_POST(self):
+        self._dispatch("POST", self._read_body())
+
+    def _dispatch(self, method, body):
+        host, path, params = self._split()
+        with self.server.stats_lock:
+            self.server.stats[host] = self.server.stats.get(host, 0) + 1
+        ok, headers = self._gate(host)
+        if not ok:
+            return
+        route = ROUTES.get(host)
+        payload = route(self, method, path, params, body) if route else None
+        if payload is None:
+            self._send_json({"error": f"No mock for {host}{path}"}, 404, headers)
+        else:
+            self._send_json(payload, 200, headers)
+
+    # Steam
+
+    def steam_store(self, method, path, params, body):
+        cat = self.server.catalog
+        if path.startswith("/search/results"):
+            start = int(params.get("start", 0))
+            count = int(params.get("count", 25))
+            games = self._steam_chart(params.get("filter", ""), params.get("cc", "us"))
+            page = games[start:start + count]
+            if params.get("infinite") == "1":
+                return {"success": 1, "results_html": "".join(_search_row(g) for g in page),
+                        "total_count": len(games), "start": start}
+            return {"desc": "", "items": [
+                {"name": g["name"], "logo": f"https://shared.akamai.steamstatic.com/store_item_assets/steam/apps/{g['appid']}/capsule_sm_120.jpg"}
+                for g in page]}
+        if path.startswith("/api/appdetails"):
+            result = {}
+            price_only = params.get("filters") == "price_overview"
+            for appid in params.get("appids", "").split(","):
+                g = cat.steam_by_id.get(appid)
+                if not g:
+                    result[appid] = {"success": False}
+                    continue
+                data = _app_details(g)
+                if price_only:
+                    data = {"price_overview": data["price_overview"]} if "price_overview" in data else []
+                result[appid] = {"success": True, "data": data}
+            return result
+        if path.startswith("/api/featuredcategories"):
+            def items(games):
+                return {"items": [_featured_item(g) for g in games[:10]]}
+            specials = [g for g in cat.steam if g["discount"] and not g["is_free"]]
+            return {
+                "specials": items(specials),
+                "top_sellers": items(self._steam_chart("topsellers", params.get("cc", "us"))),
+                "new_releases": items(self._steam_chart("popularnew", params.get("cc", "us"))),
+                "coming_soon": items([g for g in cat.steam if g["coming_soon"]]),
+            }
+        m = re.match(r"/appreviews/(\d+)", path)
+        if m:
+            g = cat.steam_by_id.get(m.group(1))
+            if not g:
+                return {"success": 1, "query_summary": {"num_reviews": 0, "total_reviews": 0}}
+            if params.get("filter") == "recent" and params.get("num_per_page", "20") != "0":
+                reviews, cursor = _recent_reviews(g, cat.review_epoch, params.get("cursor", "*"),
+                                                  min(int(params.get("num_per_page", 20)), 100))
+                return {"success": 1, "query_summary": {"num_reviews": len(reviews)},
+                        "reviews": reviews, "cursor": cursor}
+            return {"success": 1, "query_summary": {
+                "review_score_desc": g["review_desc"],
+                "total_positive": g["positive"],
+                "total_negative": g["negative"],
+                "total_reviews": g["positive"] + g["negative"],
+            }, "reviews": [], "cursor": "*"}
+        return None
+
+    def _steam_chart(self, filter_type, cc="us"):
+        cat = self.server.catalog
+        if filter_type == "popularwishlist":
+            games = sorted((g for g in cat.steam if g["coming_soon"]), key=lambda g: g["wishlist_rank"])
+        elif filter_type == "popularnew":
+            games = [g for g in cat.steam if not g["coming_soon"]][::3]
+        else:
+            games = cat.steam
+        if cc.lower() == "us":
+            return games
+        # Other regions: same chart with a deterministic per-region shuffle of ranks
+        def regional_rank(item):
+            i, g = item
+            noise = zlib.crc32(f"{cc.lower()}:{g['appid']}".encode()) / 0xFFFFFFFF
+            return i * (0.3 + 1.4 * noise)
+        return [g for _, g in sorted(enumerate(games), key=regional_rank)]
+
+    def steam_api(self, method, path, params, body):
+        if "GetNumberOfCurrentPlayers" in path:
+            g = self.server.catalog.steam_by_id.get(params.get("appid", ""))
+            if not g:
+                return {"response": {"result": 42}}
+            return {"response": {"player_count": g["players"], "result": 1}}
+        if "GetGamesByConcurrentPlayers" in path:
+            released = [g for g in self.server.catalog.steam if not g["coming_soon"]]
+            top = sorted(released, key=lambda g: -g["players"])[:100]
+            return {"response": {"last_update": int(time.time()), "ranks": [
+                {"rank": i, "appid": int(g["appid"]), "concurrent_in_game": g["players"],
+                 "peak_in_game": int(g["players"] * 1.3)}
+                for i, g in enumerate(top, 1)]}}
+        return None
+
+    # Twitch
+
+    def twitch_id(self, method, path, params, body):
+        if path.startswith("/oauth2/token"):
+            return {"access_token": f"mock-{int(time.time())}", "expires_in": 5184000, "token_type": "bearer"}
+        return None
+
+    def twitch_helix(self, method, path, params, body):
+        cat = self.server.catalog
+        first = min(int(params.get("first", 20)), 100)
+        offset = int(params.get("after") or 0)
+        if path.startswith("/helix/games/top"):
+            rows = cat.twitch_games
+        elif path.startswith("/helix/streams"):
+            rows = cat.streams
+            if params.get("game_id"):
+                rows = [s for s in rows if s["game_id"] == params["game_id"]]
+            if params.get("language"):
+                rows = [s for s in rows if s["language"] == params["language"]]
+        else:
+            return None
+        page = rows[offset:offset + first]
+        cursor = str(offset + first) if offset + first < len(rows) else ""
+        data = [{k: v for k, v in r.items() if k != "igdb_id"} for r in page]
+        return {"data": data, "pagination": {"cursor": cursor} if cursor else {}}
+
+    # IGDB
+
+    def igdb(self, method, path, params, body):
+        endpoint = path.rsplit("/", 1)[-1]
+        if endpoint == "multiquery":
+            return [{"name": name, "result": igdb_query(self.server.catalog, sub_endpoint, sub_body) or []}
+                    for sub_endpoint, name, sub_body in MULTIQUERY_RE.findall(body)]
+        return igdb_query(self.server.catalog, endpoint, body)
+
+    # CheapShark / Epic / Telegram
+
+    def cheapshark(self, method, path, params, body):
+        cat = self.server.catalog
+        if path.endswith("/stores"):
+            return [{"storeID": str(i), "storeName": f"Store {i}", "isActive": 1} for i in range(1, 35)]
+        if path.endswith("/deals"):
+            size = int(params.get("pageSize", 60))
+            page = int(params.get("pageNumber", 0))
+            deals = []
+            for g in cat.steam[page * size:(page + 1) * size]:
+                normal = (g["price"] or 999) / 100
+                savings = max(g["discount"], 10)
+                deals.append({
+                    "title": g["name"], "dealID": f"deal{g['appid']}", "storeID": str(int(g["appid"]) % 34 + 1),
+                    "steamAppID": g["appid"], "salePrice": f"{normal * (100 - savings) / 100:.2f}",
+                    "normalPrice": f"{normal:.2f}", "savings": f"{savings:.6f}",
+                    "metacriticScore": "85", "steamRatingPercent": "90", "steamRatingText": "Very Positive",
+                    "dealRating": "9.0", "thumb": "",
+                })
+            return deals
+        return None
+
+    def epic(self, method, path, params, body):
+        def element(i, upcoming):
+            key = "upcomingPromotionalOffers" if upcoming else "promotionalOffers"
+            return {
+                "title": f"Epic Free Game {i}", "description": "", "productSlug": f"epic-free-game-{i}",
+                "seller": {"name": "Mock Publisher"},
+                "price": {"totalPrice": {"fmtPrice": {"originalPrice": "$19.99"}}},
+                "promotions": {key: [{"promotionalOffers": [{
+                    "startDate": "2026-01-01T15:00:00.000Z", "endDate": "2026-01-08T15:00:00.000Z",
+                    "discountSetting": {"discountPercentage": 0}}]}]},
+            }
+        elements = [element(1, False), element(2, False), element(3, True)]
+        return {"data": {"Catalog": {"searchStore": {"elements": elements}}}}
+
+    def telegram(self, method, path, params, body):
+        if path.endswith("/sendMessage"):
+            return {"ok": True, "result": {"message_id": random.randint(1, 10 ** 6)}}
+        return None
+
+
+ROUTES = {
+    "store.steampowered.com": MockHandler.steam_store,
+    "api.steampowered.com": MockHandler.steam_api,
+    "id.twitch.tv": MockHandler.twitch_id,
+    "api.twitch.tv": MockHandler.twitch_helix,
+    "api.igdb.com": MockHandler.igdb,
+    "www.cheapshark.com": MockHandler.cheapshark,
+    "store-site-backend-static-ipv4.ak.epicgames.com": MockHandler.epic,
+    "api.telegram.org": MockHandler.telegram,
+}
+
+
+# ── Payload builders ─────────────────────────────────────────────────────────
+
+def _search_row(g):
+    price = "Free" if g["is_free"] else f"${g['price'] * (100 - g['discount']) / 10000:.2f}"
+    return (
+        f'<a href="https://store.steampowered.com/app/{g["appid"]}/" data-ds-appid="{g["appid"]}" '
+        f'class="search_result_row ds_collapse_flag">'
+        f'<div class="responsive_search_name_combined"><div class="col search_name ellipsis">'
+        f'<span class="title">{g["name"]}</span></div>'
+        f'<div class="col search_released responsive_secondrow">{g["release_date"]}</div>'
+        f'<div class="col search_reviewscore responsive_secondrow"><span class="search_review_summary positive" '
+        f'data-tooltip-html="{g["review_desc"]}&lt;br&gt;90% of the {g["positive"]:,} user reviews are positive.">'
+        f'</span></div>'
+        f'<div class="col search_price_discount_combined responsive_secondrow">'
+        f'<div class="discount_block search_discount_block" data-discount="{g["discount"]}">'
+        f'<div class="discount_prices"><div class="discount_final_price">{price}</div></div></div></div>'
+        f'</div></a>\n'
+    )
+
+
+def _recent_reviews(g, epoch, cursor, num):
+    """filter=recent page: newest first, cursor is the index of the next (older) review."""
+    per_day = max(g["positive"] // 1000, 5)
+    interval = 86400 / per_day
+    newest = int((time.time() - epoch) / interval)
+    start = newest if cursor in ("*", "") else int(cursor)
+    ratio = g["positive"] / max(g["positive"] + g["negative"], 1)
+    reviews = []
+    for k in range(start, max(start - num, -1), -1):
+        reviews.append({
+            "recommendationid": f"{g['appid']}{k:08d}",
+            "timestamp_created": int(epoch + k * interval),
+            "timestamp_updated": int(epoch + k * interval),
+            "voted_up": (k * 2654435761 + int(g["appid"])) % 1000 < ratio * 1000,
+            "language": "english",
+        })
+    next_cursor = str(start - len(reviews)) if start - len(reviews) >= 0 else cursor
+    return reviews, next_cursor
+
+
+def _app_details(g):
+    data = {
+        "type": g["type"],
+        "name": g["name"],
+        "steam_appid": int(g["appid"]),
+        "is_free": g["is_free"],
+        "genres": [{"id": str(i), "description": d} for i, d in enumerate(g["genres"])],
+        "release_date": {"coming_soon": g["coming_soon"], "date": g["release_date"]},
+    }
+    if not g["is_free"]:
+        final = g["price"] * (100 - g["discount"]) // 100
+        data["price_overview"] = {
+            "currency": "USD", "initial": g["price"], "final": final,
+            "discount_percent": g["discount"], "final_formatted": f"${final / 100:.2f}",
+        }
+    return data
+
+
+def _featured_item(g):
+    final = g["price"] * (100 - g["discount"]) // 100
+    return {"id": int(g["appid"]), "type": 0, "name": g["name"], "discounted": bool(g["discount"]),
+            "discount_percent": g["discount"], "original_price": g["price"], "final_price": final,
+            "currency": "USD", "windows_available": True}
+
+
+def _updated_at(g):
+    """A slice of the IGDB catalog (1 in 40 games) is edited every hour, for delta syncs."""
+    hour = int(time.time()) // 3600
+    return hour * 3600 if (g["id"] + hour) % 40 == 0 else g["updated_at"]
+
+
+MULTIQUERY_RE = re.compile(r'query (\w+) "((?:[^"\\]|\\.)*)" \{(.*?)\};', re.DOTALL)
+
+
+def igdb_query(cat, endpoint, body):
+    """Very small Apicalypse interpreter: limit/offset, id/game lists, search, sort by date."""
+    limit = int((re.search(r"limit (\d+)", body) or [0, 10])[1])
+    offset = int((re.search(r"offset (\d+)", body) or [0, 0])[1])
+    ids = re.search(r"\bid = \(([\d,\s]+)\)", body)
+    game_ids = re.search(r"\bgame = \(([\d,\s]+)\)", body)
+    search = re.search(r'search "((?:[^"\\]|\\.)*)"', body)
+    since = re.search(r"\bupdated_at > (\d+)", body)
+
+    if endpoint == "games":
+        games = cat.igdb
+        if ids:
+            wanted = {int(x) for x in ids.group(1).split(",") if x.strip()}
+            games = [g for g in games if g["id"] in wanted]
+        if search:
+            term = search.group(1).lower()
+            games = [g for g in games if term in g["name"].lower()] or games[:1]
+        if "hypes >= " in body:
+            min_hype = int(re.search(r"hypes >= (\d+)", body).group(1))
+            games = [g for g in games if (g["hypes"] or 0) >= min_hype]
+        lo = re.search(r"first_release_date >=? (\d+)", body)
+        hi = re.search(r"first_release_date <= (\d+)", body)
+        if lo:
+            games = [g for g in games if g["first_release_date"] >= int(lo.group(1))]
+        if hi:
+            games = [g for g in games if g["first_release_date"] <= int(hi.group(1))]
+        if since:
+            games = [g for g in games if _updated_at(g) > int(since.group(1))]
+        if "sort first_release_date" in body:
+            games = sorted(games, key=lambda g: g["first_release_date"])
+        if "sort updated_at" in body:
+            games = sorted(games, key=_updated_at)
+        return [{**g, "updated_at": _updated_at(g)} for g in games[offset:offset + limit]]
+
+    if endpoint == "release_dates":
+        games = cat.igdb
+        if game_ids:
+            wanted = {int(x) for x in game_ids.group(1).split(",") if x.strip()}
+            games = [g for g in games if g["id"] in wanted]
+        else:
+            games = sorted(games, key=lambda g: -g["first_release_date"])
+        lo = re.search(r"\bdate >= (\d+)", body)
+        hi = re.search(r"\bdate <= (\d+)", body)
+        if lo:
+            games = [g for g in games if g["first_release_date"] >= int(lo.group(1))]
+        if hi:
+            games = [g for g in games if g["first_release_date"] <= int(hi.group(1))]
+        if since:
+            games = [g for g in games if _updated_at(g) > int(since.group(1))]
+        if "sort updated_at" in body:
+            games = sorted(games, key=_updated_at)
+        expand = "game." in body
+        rows = []
+        for g in games:
+            for platform in g["platforms"]:
+                ts = g["first_release_date"]
+                rows.append({
+                    "id": g["id"] * 10 + platform["id"],
+                    "game": {k: g[k] for k in ("id", "name", "url", "follows", "total_rating")} if expand else g["id"],
+                    "date": ts,
+                    "human": datetime.fromtimestamp(ts).strftime("%b %d, %Y"),
+                    "date_format": 0,
+                    "platform": {"id": platform["id"], "name": platform["name"]},
+                    "updated_at": _updated_at(g),
+                })
+        return rows[offset:offset + limit]
+
+    if endpoint == "popularity_primitives":
+        ranked = sorted(cat.igdb, key=lambda g: -g["follows"])
+        return [{"id": i, "game_id": g["id"], "value": g["follows"] / 10000, "popularity_type": 7}
+                for i, g in enumerate(ranked[offset:offset + limit])]
+
+    if endpoint == "platforms":
+        return PLATFORMS[offset:offset + limit]
+    return None
+
+
+# ── Server ───────────────────────────────────────────────────────────────────
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, catalog, latency=0, jitter=0, error_rate=0.0,
+                 rate_limit=0, rate_window=60, verbose=False):
+        super().__init__(address, MockHandler)
+        self.catalog = catalog
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.verbose = verbose
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+        self._windows = {}
+
+    def take_token(self, host):
+        """Fixed-window limiter per host. Returns (remaining after this call, reset epoch)."""
+        now = time.time()
+        with self.stats_lock:
+            start, used = self._windows.get(host, (now, 0))
+            if now - start >= self.rate_window:
+                start, used = now, 0
+            used += 1
+            self._windows[host] = (start, used)
+        return self.rate_limit - used, start + self.rate_window
+
+
+def serve(port=8765, **kwargs):
+    """Start a MockServer on a background thread and return it (call .shutdown() when done)."""
+    catalog = Catalog(kwargs.pop("games", 500), kwargs.pop("streams", 2000), kwargs.pop("seed", 1))
+    server = MockServer(("127.0.0.1", port), catalog, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for Steam/Twitch/IGDB/CheapShark/EGS/Telegram")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--games", type=int, default=500, help="synthetic Steam games (IGDB mirrors up to 3000)")
+    parser.add_argument("--streams", type=int, default=2000, help="synthetic live Twitch streams")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0, help="added latency per request (ms)")
+    parser.add_argument("--jitter", type=float, default=0, help="+/- latency jitter (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per host per window (0 = unlimited)")
+    parser.add_argument("--rate-window", type=float, default=60, help="rate-limit window (seconds)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = serve(args.port, games=args.games, streams=args.streams, seed=args.seed,
+                   latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                   rate_limit=args.rate_limit, rate_window=args.rate_window, verbose=args.verbose)
+    print(f"Mock upstreams on http://127.0.0.1:{args.port} "
+          f"({args.games} games, {args.streams} streams) — Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print("Requests served:", json.dumps(server.stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
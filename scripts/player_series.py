@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Compact player-count time series for Steam apps — written by the intra-day
+sampler (steam_trending.py --sample) and by each daily report.
+
+Storage is flat arrays of 32-bit ints, one row per appid (row numbers are
+assigned once in appids.json and never reused):
+  raw-YYYY-MM-DD.u32  SLOTS_PER_DAY slots per row, one per SLOT_MINUTES
+  daily-YYYY.u32      366 days x (peak, avg, min) per row
+Values are stored as players + 1 so that 0 (a file hole) means "no sample".
+Raw days are kept for RAW_RETENTION_DAYS; the daily rollups are kept forever
+(~4 KB per appid per year). The sampler and the report run as separate
+processes, so row assignment and writes happen under a file lock (.lock).
+"""
+
+import json
+import os
+import threading
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import file_lock
+
+SERIES_DIR = Path(__file__).parent / "steam_data" / "player_series"
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+RAW_RETENTION_DAYS = 14
+DAYS_PER_YEAR = 366
+
+_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+_ITEM = 4
+
+
+def _read(path, offset, count):
+    """`count` ints from `path` starting at item `offset` (holes/EOF read as 0)."""
+    values = array(_TYPECODE)
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset * _ITEM)
+            data = f.read(count * _ITEM)
+    except FileNotFoundError:
+        data = b""
+    values.frombytes(data[:len(data) - len(data) % _ITEM])
+    values.extend([0] * (count - len(values)))
+    return values
+
+
+def _load(path):
+    """Whole file as an int array (empty if missing)."""
+    values = array(_TYPECODE)
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return values
+    values.frombytes(data[:len(data) - len(data) % _ITEM])
+    return values
+
+
+def _slice(values, offset, count):
+    """values[offset:offset + count], zero-padded past the end of the file."""
+    part = values[offset:offset + count]
+    part.extend([0] * (count - len(part)))
+    return part
+
+
+def _write_items(path, items):
+    """Write {item offset: value} into `path`, creating it (sparse) if needed."""
+    mode = "r+b" if path.exists() else "w+b"
+    with open(path, mode) as f:
+        for offset in sorted(items):
+            f.seek(offset * _ITEM)
+            f.write(array(_TYPECODE, [items[offset]]).tobytes())
+
+
+def _stats(values):
+    """(peak, avg, min) over the sampled (non-zero) encoded values, or None."""
+    sampled = [v - 1 for v in values if v]
+    if not sampled:
+        return None
+    return max(sampled), round(sum(sampled) / len(sampled)), min(sampled)
+
+
+class PlayerSeries:
+    def __init__(self, root=SERIES_DIR):
+        self.root = Path(root)
+        self.lock = threading.Lock()
+        self._rows = None
+
+    # ── Row index ────────────────────────────────────────────────────────────
+
+    def _index(self):
+        if self._rows is None:
+            path = self.root / "appids.json"
+            appids = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+            self._rows = {appid: i for i, appid in enumerate(appids)}
+        return self._rows
+
+    def _assign_rows(self, appids):
+        rows = self._index()
+        if any(a not in rows for a in appids):
+            self._rows = None  # another process (sampler vs. report) may have added rows
+            rows = self._index()
+        new = [a for a in dict.fromkeys(appids) if a not in rows]
+        if new:
+            for appid in new:
+                rows[appid] = len(rows)
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self.root / "appids.json"
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(sorted(rows, key=rows.get)), encoding="utf-8")
+            os.replace(tmp, path)
+        return rows
+
+    def _raw_path(self, day):
+        return self.root / f"raw-{day:%Y-%m-%d}.u32"
+
+    def _daily_path(self, year):
+        return self.root / f"daily-{year}.u32"
+
+    # ── Writing ──────────────────────────────────────────────────────────────
+
+    def record(self, counts, when=None):
+        """Store {appid: players} in the slot for `when` (default now) and refresh that day's rollup."""
+        when = when or datetime.now()
+        slot = (when.hour * 60 + when.minute) // SLOT_MINUTES
+        with self.lock, file_lock.locked(self.root / ".lock"):
+            rows = self._assign_rows([str(a) for a in counts])
+            self.root.mkdir(parents=True, exist_ok=True)
+            _write_items(self._raw_path(when.date()), {
+                rows[str(appid)] * SLOTS_PER_DAY + slot: max(int(players), 0) + 1
+                for appid, players in counts.items()
+            })
+            self._rollup(when.date(), [rows[str(a)] for a in counts])
+
+    def _rollup(self, day, rows):
+        raw = _load(self._raw_path(day))
+        doy = day.timetuple().tm_yday - 1
+        items = {}
+        for row in rows:
+            stats = _stats(_slice(raw, row * SLOTS_PER_DAY, SLOTS_PER_DAY))
+            if stats:
+                base = (row * DAYS_PER_YEAR + doy) * 3
+                for i, value in enumerate(stats):
+                    items[base + i] = value + 1
+        if items:
+            _write_items(self._daily_path(day.year), items)
+
+    def prune(self, today=None):
+        """Delete raw day files older than RAW_RETENTION_DAYS (rollups are kept)."""
+        cutoff = f"raw-{(today or datetime.now().date()) - timedelta(days=RAW_RETENTION_DAYS):%Y-%m-%d}.u32"
+        for path in self.root.glob("raw-*.u32"):
+            if path.name < cutoff:
+                path.unlink()
+
+    # ── Reading ──────────────────────────────────────────────────────────────
+
+    def trailing(self, appids, hours=24, end=None, min_samples=1):
+        """{appid: (peak, avg, min)} over the `hours` before `end` (default now).
+        Appids with fewer than `min_samples` samples in the window are omitted."""
+        end = end or datetime.now()
+        start = end - timedelta(hours=hours)
+        rows = self._index()
+        windows = []  # (raw day array, first slot, slot count) per day touched
+        day = start.date()
+        while day <= end.date():
+            lo = 0 if day > start.date() else (start.hour * 60 + start.minute) // SLOT_MINUTES + 1
+            hi = SLOTS_PER_DAY - 1 if day < end.date() else (end.hour * 60 + end.minute) // SLOT_MINUTES
+            if hi >= lo:
+                windows.append((_load(self._raw_path(day)), lo, hi - lo + 1))
+            day += timedelta(days=1)
+        result = {}
+        for appid in appids:
+            row = rows.get(str(appid))
+            if row is None:
+                continue
+            values = array(_TYPECODE)
+            for raw, lo, count in windows:
+                values.extend(_slice(raw, row * SLOTS_PER_DAY + lo, count))
+            stats = _stats(values)
+            if stats and sum(1 for v in values if v) >= min_samples:
+                result[str(appid)] = stats
+        return result
+
+    def daily(self, appids, days):
+        """{appid: {"YYYY-MM-DD": (peak, avg, min)}} for the given dates."""
+        rows = self._index()
+        result = {}
+        for appid in appids:
+            row = rows.get(str(appid))
+            if row is None:
+                continue
+            per_day = {}
+            for day in days:
+                doy = day.timetuple().tm_yday - 1
+                values = _read(self._daily_path(day.year), (row * DAYS_PER_YEAR + doy) * 3, 3)
+                if values[0]:
+                    per_day[f"{day:%Y-%m-%d}"] = tuple(v - 1 for v in values)
+            if per_day:
+                result[str(appid)] = per_day
+        return result
+
+
+_series = None
+_series_lock = threading.Lock()
+
+
+def get_series():
+    global _series
+    with _series_lock:
+        if _series is None:
+            _series = PlayerSeries()
+        return _series
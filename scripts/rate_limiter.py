@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Per-host token-bucket rate limiter — used by http_client for every request.
+Each upstream gets its own budget (rate + burst). Buckets adapt to what the
+server reports: Twitch Ratelimit-Remaining/Ratelimit-Reset and Retry-After on
+429/503 responses pause that host until the server says it may continue.
+"""
+
+import email.utils
+import threading
+import time
+
+# host -> (tokens per second, burst capacity)
+HOST_BUDGETS = {
+    "api.twitch.tv": (800 / 60, 800),              # Helix: 800 points/min per app token
+    "id.twitch.tv": (2, 4),
+    "api.igdb.com": (4, 4),                        # IGDB: 4 req/s
+    "store.steampowered.com": (200 / 300, 100),    # Store: ~200 req per 5 min
+    "api.steampowered.com": (10, 20),              # Web API: 100k/day
+    "www.cheapshark.com": (2, 4),
+    "api.telegram.org": (1, 3),                    # ~1 msg/s per chat
+}
+DEFAULT_BUDGET = (5, 5)
+MAX_PAUSE = 120  # never honour a server-requested pause longer than this (seconds)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def acquire(self):
+        """Block until a token is available, then take it. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def try_acquire(self):
+        """Take a token only if one is available right now. Returns True if taken."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self.paused_until and self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def limit_remaining(self, remaining):
+        """Server says only `remaining` requests are left in its window."""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, remaining)
+
+    def pause(self, seconds):
+        """Hold all requests to this host for `seconds`."""
+        seconds = min(max(seconds, 0.0), MAX_PAUSE)
+        with self.lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 0
+            self.updated = self.paused_until
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(host):
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            rate, capacity = HOST_BUDGETS.get(host, DEFAULT_BUDGET)
+            bucket = _buckets[host] = TokenBucket(rate, capacity)
+        return bucket
+
+
+def acquire(host):
+    return get_bucket(host).acquire()
+
+
+def try_acquire(host):
+    return get_bucket(host).try_acquire()
+
+
+def parse_retry_after(value):
+    """Retry-After is either delta-seconds or an HTTP date. Returns seconds or None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        dt = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(dt.timestamp() - time.time(), 0.0)
+
+
+def observe(host, status, headers):
+    """Adapt the host's bucket to rate-limit headers. Returns seconds paused (0 if none)."""
+    bucket = get_bucket(host)
+    headers = headers or {}
+
+    # Twitch: Ratelimit-Remaining (points left) + Ratelimit-Reset (unix epoch seconds)
+    remaining = headers.get("ratelimit-remaining")
+    if remaining is not None:
+        try:
+            remaining = int(remaining)
+        except ValueError:
+            remaining = None
+    if remaining is not None:
+        bucket.limit_remaining(remaining)
+        if remaining <= 0:
+            try:
+                reset_in = float(headers.get("ratelimit-reset", "")) - time.time()
+            except ValueError:
+                reset_in = 1.0
+            bucket.pause(reset_in)
+            return reset_in
+
+    if status in (429, 503):
+        delay = parse_retry_after(headers.get("retry-after"))
+        if delay is None:
+            delay = 1.0 / bucket.rate
+        bucket.pause(delay)
+        return delay
+    return 0.0
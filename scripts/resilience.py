@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Retry / backoff / circuit-breaker policy shared by every fetcher (via http_client).
+Failed calls are retried with exponential backoff and full jitter. A per-host
+circuit breaker fails fast once a host keeps failing, so one dead upstream
+costs a few seconds instead of a 30s timeout per call. Tail-latency-sensitive
+GETs can be hedged: if the first attempt is slow, a second identical request
+races it and the first good answer wins.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5   # seconds; attempt n sleeps up to BACKOFF_BASE * 2**n
+BACKOFF_CAP = 8.0
+
+BREAKER_THRESHOLD = 5    # consecutive failures before a host's circuit opens
+BREAKER_COOLDOWN = 60.0  # seconds before a single probe request is let through
+
+# host -> seconds to wait on the first attempt before sending a hedge request
+HEDGE_AFTER = {
+    "api.steampowered.com": 1.5,
+    "store.steampowered.com": 2.5,
+}
+
+_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+
+class CircuitOpen(Exception):
+    """Raised without touching the network while a host's circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, host, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0 or self.probing:
+                raise CircuitOpen(f"Circuit open for {self.host} "
+                                  f"({self.failures} consecutive failures, retry in {max(remaining, 0):.0f}s)")
+            self.probing = True  # half-open: let exactly one request through
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(host):
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given (0-based) retry attempt."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def hedged(fn, delay, may_hedge=lambda: True):
+    """Run fn(); if it hasn't finished `delay` seconds after it started, race a second
+    fn(). The delay counts from when a pool worker picks the first call up, so time
+    queued behind other hedged calls never triggers a hedge. may_hedge() is asked
+    just before the second call (e.g. for a rate-limit token); when it says no, the
+    first call is simply awaited."""
+    started = threading.Event()
+
+    def first_call():
+        started.set()
+        return fn()
+
+    first = _hedge_pool.submit(first_call)
+    started.wait()
+    done, _ = wait([first], timeout=delay)
+    if done or not may_hedge():
+        return first.result()
+    second = _hedge_pool.submit(fn)
+    pending = {first, second}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = error or future.exception()
+    raise error
+
+
+def call(host, fn, retries=MAX_RETRIES, hedge_after=None, retryable=lambda e: True):
+    """Call fn() under the host's circuit breaker with retries and optional hedging.
+
+    retryable(exc) decides whether a failure counts against the host and is
+    worth another attempt; other exceptions are re-raised immediately.
+    """
+    breaker = get_breaker(host)
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = hedged(fn, hedge_after) if hedge_after else fn()
+        except Exception as e:
+            if not retryable(e):
+                breaker.record_success()  # the host answered; the request itself was bad
+                raise
+            breaker.record_failure()
+            if attempt >= retries or breaker.is_open:
+                raise
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+        breaker.record_success()
+        return result
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Incremental Steam review ingestion — review velocity per app and day.
+Reads /appreviews/<appid>?filter=recent newest-first and stops at the newest
+review seen on the previous run (a timestamp + recommendationid watermark kept
+per appid), so each run costs pages in proportion to new reviews only. New
+reviews are counted into per-day positive/negative totals in SQLite.
+The first run for an app only sets its watermark; history is not backfilled.
+
+When a run stops short of the watermark (MAX_PAGES ran out or a page failed),
+the reviews it did read are counted and the unread stretch is kept as a gap:
+the cursor where paging stopped, the oldest review counted above it and the
+old watermark below it. Later runs resume each gap from its cursor until they
+reach that floor, so a burst is counted in full, just over several runs.
+"""
+
+import json
+
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
+REVIEWS_FILE = Path(__file__).parent / "steam_data" / "reviews.sqlite3"
+PAGE_SIZE = 100
+MAX_PAGES = 20  # per app per run; a viral launch beyond this is counted partially
+WORKERS = 8
+
+
+class ReviewStore:
+    def __init__(self, path=REVIEWS_FILE):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self._db = None
+
+    def _conn(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                " appid TEXT PRIMARY KEY, last_ts INTEGER, last_id TEXT, checked_at REAL)"
+            )
+            columns = {row[1] for row in db.execute("PRAGMA table_info(watermarks)")}
+            if "gaps" not in columns:
+                db.execute("ALTER TABLE watermarks ADD COLUMN gaps TEXT")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS daily ("
+                " appid TEXT, day TEXT, positive INTEGER, negative INTEGER,"
+                " PRIMARY KEY (appid, day))"
+            )
+            self._db = db
+        return self._db
+
+    def watermark(self, appid):
+        """(last_ts, last_id) of the newest review already counted, or None."""
+        with self.lock:
+            row = self._conn().execute(
+                "SELECT last_ts, last_id FROM watermarks WHERE appid = ?", (appid,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def gaps(self, appid):
+        """Unread stretches below the watermark: [[cursor, top_ts, top_id, floor_ts, floor_id], ...]."""
+        with self.lock:
+            row = self._conn().execute("SELECT gaps FROM watermarks WHERE appid = ?", (appid,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else []
+
+    def save(self, appid, newest, counts, gaps=None):
+        """Advance appid's watermark to `newest`, replace its gaps (when given) and add
+        {day: [pos, neg]} to its daily totals."""
+        with self.lock:
+            db = self._conn()
+            if newest:
+                db.execute("INSERT INTO watermarks (appid, last_ts, last_id, checked_at) VALUES (?, ?, ?, ?)"
+                           " ON CONFLICT (appid) DO UPDATE SET last_ts = excluded.last_ts,"
+                           " last_id = excluded.last_id, checked_at = excluded.checked_at",
+                           (appid, newest[0], newest[1], time.time()))
+            if gaps is not None:
+                db.execute("UPDATE watermarks SET gaps = ? WHERE appid = ?", (json.dumps(gaps) if gaps else None, appid))
+            for day, (pos, neg) in counts.items():
+                db.execute(
+                    "INSERT INTO daily VALUES (?, ?, ?, ?) ON CONFLICT (appid, day) DO UPDATE"
+                    " SET positive = positive + excluded.positive, negative = negative + excluded.negative",
+                    (appid, day, pos, neg),
+                )
+            db.commit()
+
+    def daily(self, appids, since):
+        """{appid: {day: (positive, negative)}} for days >= since ("YYYY-MM-DD")."""
+        appids = list(appids)
+        if not appids:
+            return {}
+        marks = ",".join("?" * len(appids))
+        with self.lock:
+            rows = self._conn().execute(
+                f"SELECT appid, day, positive, negative FROM daily WHERE day >= ? AND appid IN ({marks})",
+                [since] + appids,
+            ).fetchall()
+        result = {}
+        for appid, day, pos, neg in rows:
+            result.setdefault(appid, {})[day] = (pos, neg)
+        return result
+
+    def totals(self, appids, since):
+        """{appid: (positive, negative)} summed over days >= since."""
+        return {appid: (sum(p for p, _ in days.values()), sum(n for _, n in days.values()))
+                for appid, days in self.daily(appids, since).items()}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ReviewStore()
+        return _store
+
+
+# ── Ingestion ────────────────────────────────────────────────────────────────
+
+def fetch_reviews(appid, floor, cursor="*", top=None, headers=None, max_pages=MAX_PAGES,
+                  deadline=None):
+    """Reviews from `cursor` down to `floor` (ts, recommendationid), newest first, skipping
+    any above `top` (ts, id; already counted). Returns (reviews, complete, cursor):
+    complete is False when max_pages ran out, a page failed or the `deadline`
+    (time.monotonic()) passed before the floor, and the returned cursor is where to resume."""
+    url = f"https://store.steampowered.com/appreviews/{appid}"
+    seen = set()
+    reviews = []
+    for _ in range(max_pages):
+        if deadline is not None and time.monotonic() >= deadline:
+            return reviews, False, cursor
+        data = http_client.fetch_json(url, {
+            "json": "1",
+            "filter": "recent",
+            "language": "all",
+            "purchase_type": "all",
+            "review_type": "all",
+            "num_per_page": str(PAGE_SIZE),
+            "cursor": cursor,
+        }, headers=headers, default={}, label=f"Steam reviews ({appid})")
+        if not data.get("success"):
+            return reviews, False, cursor
+        page = data.get("reviews", [])
+        for review in page:
+            rid = review.get("recommendationid", "")
+            ts = review.get("timestamp_created", 0)
+            if floor and (rid == floor[1] or ts < floor[0]):
+                return reviews, True, cursor
+            if top and (rid == top[1] or ts > top[0]):
+                continue
+            if rid not in seen:
+                seen.add(rid)
+                reviews.append(review)
+        next_cursor = data.get("cursor", "")
+        if len(page) < PAGE_SIZE or not next_cursor or next_cursor == cursor:
+            return reviews, True, cursor
+        cursor = next_cursor
+    return reviews, floor is None, cursor
+
+
+def _marker(review):
+    return review["timestamp_created"], review["recommendationid"]
+
+
+def ingest(appid, headers=None, store=None, deadline=None):
+    """Count reviews posted since the last run (and any gaps left by earlier runs) into
+    the daily totals. Returns (new positive, new negative), or None on the first run for appid.
+    Paging stops at `deadline`; whatever is left unread is kept as a gap."""
+    store = store or get_store()
+    watermark = store.watermark(appid)
+    if watermark is None:
+        reviews, _, _ = fetch_reviews(appid, None, headers=headers, max_pages=1,
+                                      deadline=deadline)  # just find the newest
+        store.save(appid, _marker(reviews[0]) if reviews else None, {})
+        return None
+
+    reviews, complete, cursor = fetch_reviews(appid, watermark, headers=headers, deadline=deadline)
+    if not complete and not reviews:
+        return 0, 0  # nothing read at all: the watermark still holds, retry next run
+    counted = list(reviews)
+    gaps = []
+    for gap_cursor, top_ts, top_id, floor_ts, floor_id in store.gaps(appid):
+        found, closed, gap_cursor = fetch_reviews(appid, (floor_ts, floor_id), gap_cursor,
+                                                  (top_ts, top_id), headers, deadline=deadline)
+        counted.extend(found)
+        if not closed:
+            if found:
+                top_ts, top_id = _marker(found[-1])
+            gaps.append([gap_cursor, top_ts, top_id, floor_ts, floor_id])
+    if not complete:
+        gaps.insert(0, [cursor, *_marker(reviews[-1]), *watermark])
+
+    counts = {}
+    for review in counted:
+        day = datetime.fromtimestamp(review.get("timestamp_created", 0)).strftime("%Y-%m-%d")
+        bucket = counts.setdefault(day, [0, 0])
+        bucket[0 if review.get("voted_up") else 1] += 1
+    store.save(appid, _marker(reviews[0]) if reviews else None, counts, gaps)
+    return sum(c[0] for c in counts.values()), sum(c[1] for c in counts.values())
+
+
+def ingest_many(appids, headers=None, max_workers=WORKERS, deadline=None):
+    """ingest() for many apps concurrently, each stopping at `deadline`.
+    Returns {appid: (pos, neg) or None}."""
+    appids = list(appids)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(appids, pool.map(lambda a: ingest(a, headers, deadline=deadline), appids)))
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Steam store search results — single-pass parser for the /search/results/
+`results_html` fragment (json=1&infinite=1). One html.parser pass yields a row
+per <a data-ds-appid> with name, price, discount, release date and the review
+summary tooltip, so parsing stays linear in page size.
+
+crawl() pages through a chart (topsellers, popularnew, ...) to a given depth,
+fetching pages concurrently; per-host pacing is left to rate_limiter. It stops
+at the first page that fails, and crawl_ranked() also says whether it did.
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
+SEARCH_URL = "https://store.steampowered.com/search/results/"
+PAGE_SIZE = 100     # Steam caps count at 100 per request
+CRAWL_WORKERS = 4
+
+# element class -> row field whose text content it holds
+_TEXT_FIELDS = {
+    "title": "name",
+    "search_released": "release_date",
+    "discount_final_price": "price",
+    "discount_original_price": "original_price",
+    "discount_pct": "discount_text",
+}
+
+
+def _new_row(appids):
+    return {
+        "appid": appids.split(",")[0].strip(),
+        "name": "",
+        "price": "",
+        "original_price": "",
+        "discount_pct": 0,
+        "release_date": "",
+        "review_desc": "",
+        "review_tooltip": "",
+    }
+
+
+class SearchResultsParser(HTMLParser):
+    """Collects search rows while fed; call close() (or parse_search_results) to finish."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self.row = None
+        self.field = None     # row field currently receiving text
+        self.field_tag = None
+        self.field_depth = 0  # nesting of field_tag inside the capturing element
+        self.text = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "a" and attrs.get("data-ds-appid"):
+            self._finish_row()
+            self.row = _new_row(attrs["data-ds-appid"])
+            return
+        if self.row is None:
+            return
+        if self.field is not None:
+            if tag == self.field_tag:
+                self.field_depth += 1
+            return
+        classes = (attrs.get("class") or "").split()
+        if "search_review_summary" in classes and attrs.get("data-tooltip-html"):
+            summary, _, detail = attrs["data-tooltip-html"].partition("<br>")
+            self.row["review_desc"] = summary.strip()
+            self.row["review_tooltip"] = detail.strip()
+        if "discount_block" in classes and attrs.get("data-discount", "").isdigit():
+            self.row["discount_pct"] = int(attrs["data-discount"])
+        for cls in classes:
+            if cls in _TEXT_FIELDS:
+                self.field, self.field_tag, self.field_depth = _TEXT_FIELDS[cls], tag, 1
+                self.text = []
+                break
+
+    def handle_endtag(self, tag):
+        if self.field is None or tag != self.field_tag:
+            return
+        self.field_depth -= 1
+        if self.field_depth == 0:
+            value = " ".join("".join(self.text).split())
+            if self.field == "discount_text":
+                digits = value.strip("-%")
+                if digits.isdigit() and not self.row["discount_pct"]:
+                    self.row["discount_pct"] = int(digits)
+            else:
+                self.row[self.field] = value
+            self.field = None
+
+    def handle_data(self, data):
+        if self.field is not None:
+            self.text.append(data)
+
+    def _finish_row(self):
+        if self.row is not None and self.row["appid"]:
+            self.rows.append(self.row)
+        self.row = None
+        self.field = None
+
+    def close(self):
+        super().close()
+        self._finish_row()
+
+
+def parse_search_results(html: str) -> list:
+    """All rows in a results_html fragment, in page order."""
+    parser = SearchResultsParser()
+    parser.feed(html)
+    parser.close()
+    return parser.rows
+
+
+# ── Crawler ──────────────────────────────────────────────────────────────────
+
+def fetch_page(filter_type: str, start: int, count: int = PAGE_SIZE, headers: dict = None,
+               cc: str = "us", lang: str = "english"):
+    """One page of a search chart. Returns (rows, total_count); ([], 0) on failure."""
+    data = http_client.fetch_json(SEARCH_URL, {
+        "filter": filter_type,
+        "json": "1",
+        "start": str(start),
+        "count": str(count),
+        "cc": cc,
+        "l": lang,
+        "infinite": "1",
+    }, headers=headers, default={}, label=f"Steam search ({filter_type} @{start})")
+    html = data.get("results_html", "") if isinstance(data, dict) else ""
+    if not html:
+        return [], 0
+    return parse_search_results(html), int(data.get("total_count") or 0)
+
+
+def crawl(filter_type: str, depth: int, page_size: int = PAGE_SIZE, headers: dict = None,
+          max_workers: int = CRAWL_WORKERS, **kwargs) -> list:
+    """The first `depth` rows of a chart, in rank order, each appid once (see crawl_ranked)."""
+    return crawl_ranked(filter_type, depth, page_size, headers, max_workers, **kwargs)[0]
+
+
+def crawl_ranked(filter_type: str, depth: int, page_size: int = PAGE_SIZE, headers: dict = None,
+                 max_workers: int = CRAWL_WORKERS, **kwargs) -> tuple:
+    """(rows, complete): the first `depth` rows of a chart, in rank order, each appid once.
+
+    The first page tells us total_count; the remaining pages are fetched
+    concurrently. Rows repeated across pages (the chart shifting mid-crawl)
+    keep their first, highest rank. A failed page ends the crawl there, so
+    every row keeps its true rank; complete is then False.
+    """
+    page_size = min(page_size, depth)
+    first, total = fetch_page(filter_type, 0, page_size, headers, **kwargs)
+    if total:
+        depth = min(depth, total)
+    pages = [first]
+    complete = bool(first)
+    starts = list(range(page_size, depth, page_size)) if first else []
+    if starts:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(fetch_page, filter_type, start, min(page_size, depth - start),
+                                   headers, **kwargs) for start in starts]
+            for future in futures:
+                page = future.result()[0]
+                if not page:  # failed: later pages would land one page too high
+                    complete = False
+                    for rest in futures:
+                        rest.cancel()
+                    break
+                pages.append(page)
+
+    rows, seen = [], set()
+    for page in pages:
+        for row in page:
+            if row["appid"] not in seen:
+                seen.add(row["appid"])
+                rows.append(row)
+    return rows[:depth], complete
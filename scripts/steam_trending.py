@@ -7,21 +7,73 @@ Stores daily snapshots for day-over-day, weekly, and monthly comparison.
 """
 
 import json
-import re
 import sys
 import time
-import urllib.request
-import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime, timedelta
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent))
+import app_catalog
+import http_client
+import player_series
+import review_tracker
+import steam_search
+
 # Config
 CREDENTIALS_FILE = Path.home() / ".openclaw" / "credentials" / "steam-api.json"
 DATA_DIR = Path(__file__).parent / "steam_data"
 SNAPSHOT_FILE = DATA_DIR / "daily_snapshots.json"
+WATCHLIST_FILE = DATA_DIR / "watchlist.json"  # optional extra appids for --sample
+
+# How many games from each chart get enriched (details + players + reviews)
+TRENDING_LIMIT = 15
+TOPSELLERS_LIMIT = 20
+
+# How deep each search chart is crawled (ranks beyond the enriched head feed CHART MOVERS)
+CHART_DEPTH = {
+    "popularnew": 100,
+    "topsellers": 500,
+    "popularwishlist": 100,
+}
+MOVER_MIN_JUMP = 25  # places climbed (or entry rank inside the chart) to count as a mover
+MIN_AVG_SAMPLES = 6  # player samples per 24h window before movers compare averages (sampler running)
+
+# Price symbols for store currencies (others print as "12.34 CUR"); store prices come in
+# hundredths, but these currencies are shown without decimals
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥", "KRW": "₩", "BRL": "R$", "TRY": "₺"}
+WHOLE_UNIT_CURRENCIES = {"JPY", "KRW"}
+
+# featuredcategories lists ranked like a search chart; get_chart falls back to them only
+# when search is unavailable, and such rows never feed chart_ranks (a different ranking)
+FEATURED_CHARTS = {
+    "popularnew": "new_releases",
+    "topsellers": "top_sellers",
+}
+
+# Multi-region mode (--regions [cc,cc,...]): store regions compared against the US charts
+REGIONS = ["ae", "sa", "eg", "tr", "br", "de", "jp", "kr"]
+REGION_DEPTH = {"topsellers": 100}  # searched for rank diffs; trending and specials come from featured
+REGION_MIN_GAP = 20  # places higher than in the US chart to count as a regional standout
 
-# Rate limiting
-REQUEST_DELAY = 0.3  # seconds between API calls
+# Review velocity: new reviews since the last run worth calling out, and the
+# gap (percentage points) between recent and lifetime positive share that counts as a swing
+REVIEW_SPIKE_MIN = 50
+REVIEW_SPIKE_SHARE = 0.02  # ...and at least this share of the lifetime total
+REVIEW_SWING_MIN_REVIEWS = 30
+REVIEW_SWING_POINTS = 15
+
+# appdetails: static fields fetched per app, prices batched across apps
+APP_STATIC_FILTERS = "basic,genres,release_date"
+APPDETAILS_BATCH = 100
+
+# Concurrent enrichment calls in flight; per-host pacing is left to rate_limiter
+ENRICH_WORKERS = 8
+
+# Wall-clock budget (seconds) for the per-app work of a daily report: enrichment,
+# review ingestion and chart names. Whatever is unfinished at the deadline falls
+# back to cached / last-snapshot values and is marked degraded in the snapshot.
+ENRICH_BUDGET = 240
 
 # Blacklist: hardware and non-game items (by appid and name patterns)
 BLACKLIST_APPIDS = {
@@ -57,23 +109,15 @@ GENRE_NORMALIZE = {
 
 
 def load_api_key() -> str:
+    if http_client.credentials_optional() and not CREDENTIALS_FILE.exists():
+        return "replay"
     with open(CREDENTIALS_FILE, encoding="utf-8") as f:
         return json.load(f)["api_key"]
 
 
 def api_get(url: str, params: dict = None) -> dict:
-    if params:
-        url = url + "?" + urllib.parse.urlencode(params)
-    req = urllib.request.Request(url, headers={
-        "User-Agent": "SteamTrendingBot/3.0",
-        "Accept": "application/json",
-    })
-    try:
-        resp = urllib.request.urlopen(req, timeout=30)
-        return json.loads(resp.read())
-    except Exception as e:
-        print(f"  API error: {e}")
-        return {}
+    return http_client.fetch_json(url, params, headers={"User-Agent": "SteamTrendingBot/3.0"},
+                                  default={}, label="API")
 
 
 def is_blacklisted(appid: str, name: str) -> bool:
@@ -82,48 +126,112 @@ def is_blacklisted(appid: str, name: str) -> bool:
     return any(bl in name.lower() for bl in BLACKLIST_NAMES)
 
 
-def get_search_results(filter_type: str, count: int = 25) -> list:
-    data = api_get("https://store.steampowered.com/search/results/", {
-        "filter": filter_type,
-        "json": "1",
-        "start": "0",
-        "count": str(count),
-        "cc": "us",
-        "l": "english",
-        "infinite": "1",
-    })
-    if not data:
-        return []
-    html = data.get("results_html", "")
-    if not html:
-        return []
-    return parse_search_html(html, count)
+def get_search_results(filter_type: str, count: int = 25, cc: str = "us") -> list:
+    """Top `count` rows of a search chart, crawling as many pages as needed."""
+    rows = steam_search.crawl(filter_type, count, headers={"User-Agent": "SteamTrendingBot/3.0"}, cc=cc)
+    return [g for g in rows if not is_blacklisted(g["appid"], g["name"])]
+
+
+def get_featured_categories(cc: str = "us") -> dict:
+    return api_get("https://store.steampowered.com/api/featuredcategories/", {"cc": cc, "l": "english"})
+
+
+def fmt_price(cents: int, currency: str = "USD") -> str:
+    """Store price (in hundredths of the currency, as the store APIs give it) with its symbol."""
+    symbol = CURRENCY_SYMBOLS.get(currency)
+    digits = 0 if currency in WHOLE_UNIT_CURRENCIES else 2
+    amount = f"{cents / 100:,.{digits}f}"
+    return f"{symbol}{amount}" if symbol else f"{amount} {currency}"
+
+
+def featured_rows(featured: dict, key: str) -> list:
+    """One featuredcategories list (top_sellers, new_releases, ...) as search-style rows."""
+    rows = []
+    for item in (featured or {}).get(key, {}).get("items", []):
+        final = item.get("final_price", 0)
+        price = fmt_price(final, item.get("currency", "USD")) if final else ""
+        rows.append({
+            "appid": str(item.get("id", "")),
+            "name": item.get("name", "Unknown"),
+            "price": price,
+            "original_price": "",
+            "discount_pct": item.get("discount_percent", 0),
+            "release_date": "",
+            "review_desc": "",
+            "review_tooltip": "",
+        })
+    return rows
+
+
+def get_chart(filter_type: str, depth: int, featured: dict = None, cc: str = "us") -> tuple:
+    """Top `depth` rows of a search chart, in search rank order. If search returns
+    nothing, the matching featuredcategories list (see FEATURED_CHARTS) stands in.
+    Returns (rows, source, ranked): source reads e.g. "search 500" or "featured 10",
+    and ranked is True only for a complete search crawl (the rows chart_ranks may keep)."""
+    rows, ranked = steam_search.crawl_ranked(filter_type, depth, headers={"User-Agent": "SteamTrendingBot/3.0"},
+                                             cc=cc)
+    source = f"search {len(rows)}" + ("" if ranked else " (stopped at a failed page)")
+    if not rows:
+        rows = featured_rows(featured, FEATURED_CHARTS.get(filter_type, ""))[:depth]
+        source = f"featured {len(rows)}" if rows else "unavailable"
+    return [g for g in rows if not is_blacklisted(g["appid"], g["name"])], source, ranked
+
+
+def extract_specials(featured: dict) -> list:
+    specials = []
+    for item in (featured or {}).get("specials", {}).get("items", []):
+        if not is_blacklisted(str(item.get("id", "")), item.get("name", "")):
+            specials.append({
+                "appid": str(item.get("id", "")),
+                "name": item.get("name", "Unknown"),
+                "discount": item.get("discount_percent", 0),
+                "final": item.get("final_price", 0),
+                "currency": item.get("currency", "USD"),
+            })
+    return specials
+
+
+# ── Regions ──────────────────────────────────────────────────────────────────
+
+def fetch_region(cc: str) -> dict:
+    """Top sellers, trending and specials for one store region. Only top sellers
+    need search ranks (regional_rank_diff); trending (new releases) and specials
+    come from the region's featuredcategories payload. Prices and discounts come
+    with the rows themselves, so no per-app calls."""
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        sellers = pool.submit(get_search_results, "topsellers", REGION_DEPTH["topsellers"], cc)
+        featured = pool.submit(get_featured_categories, cc)
+    featured = featured.result()
+    row = lambda g: [g["appid"], g["name"], g.get("price", ""), g.get("discount_pct", 0)]
+    return {
+        "topsellers": [row(g) for g in sellers.result()],
+        "trending": [row(g) for g in featured_rows(featured, "new_releases")
+                     if not is_blacklisted(g["appid"], g["name"])],
+        "specials": extract_specials(featured)[:10],
+    }
 
 
-def parse_search_html(html: str, max_items: int = 25) -> list:
-    games = []
-    pattern = r'data-ds-appid="([^"]+)".*?class="title">(.*?)</span>'
-    for match in re.finditer(pattern, html, re.DOTALL):
-        if len(games) >= max_items:
-            break
-        raw_appid = match.group(1).strip()
-        appid = raw_appid.split(",")[0].strip()
-        name = match.group(2).strip()
-        if is_blacklisted(appid, name):
-            continue
-        price = ""
-        price_match = re.search(
-            rf'data-ds-appid="{re.escape(raw_appid)}".*?class="discount_final_price">(.*?)</(?:div|span)',
-            html, re.DOTALL
-        )
-        if price_match:
-            price = re.sub(r'<[^>]+>', '', price_match.group(1)).strip()
-        games.append({"appid": appid, "name": name, "price": price})
-    return games
+def fetch_regions(regions: list) -> dict:
+    """fetch_region for every country code at once; per-host pacing is left to rate_limiter."""
+    if not regions:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(regions)) as pool:
+        return dict(zip(regions, pool.map(fetch_region, regions)))
 
 
-def get_featured_categories() -> dict:
-    return api_get("https://store.steampowered.com/api/featuredcategories/", {"cc": "us", "l": "english"})
+def regional_rank_diff(base: list, regional: list, min_gap: int = REGION_MIN_GAP) -> list:
+    """Games ranked much higher in a region than in the base (US) chart.
+    Rows are [appid, name, ...] in rank order. Returns [appid, name, region_rank,
+    base_rank or None] sorted by the gap; unranked in the base counts as len(base) + 1."""
+    base_rank = {r[0]: i for i, r in enumerate(base, 1)}
+    diffs = []
+    for rank, r in enumerate(regional, 1):
+        other = base_rank.get(r[0])
+        gap = (other or len(base) + 1) - rank
+        if gap >= min_gap:
+            diffs.append((gap, [r[0], r[1], rank, other]))
+    diffs.sort(key=lambda d: -d[0])
+    return [d[1] for d in diffs]
 
 
 def get_current_players(appid: int, api_key: str) -> int:
@@ -137,12 +245,29 @@ def get_current_players(appid: int, api_key: str) -> int:
     return 0
 
 
-def get_app_details(appid: str) -> dict:
-    data = api_get("https://store.steampowered.com/api/appdetails/", {
-        "appids": appid,
-        "cc": "us",
-        "l": "english",
+def get_most_played() -> dict:
+    """Steam's concurrent-players chart (top 100) in one request.
+    Returns {appid: {"rank", "players", "peak"}}; {} on failure."""
+    data = api_get("https://api.steampowered.com/ISteamChartsService/GetGamesByConcurrentPlayers/v1/", {
+        "input_json": json.dumps({"context": {"language": "english", "country_code": "US", "steam_realm": 1}}),
     })
+    chart = {}
+    for row in data.get("response", {}).get("ranks", []):
+        appid = str(row.get("appid", ""))
+        if appid and appid not in BLACKLIST_APPIDS:
+            chart[appid] = {
+                "rank": row.get("rank", 0),
+                "players": row.get("concurrent_in_game", 0),
+                "peak": row.get("peak_in_game", 0),
+            }
+    return chart
+
+
+def get_app_details(appid: str, filters: str = None) -> dict:
+    params = {"appids": appid, "cc": "us", "l": "english"}
+    if filters:
+        params["filters"] = filters
+    data = api_get("https://store.steampowered.com/api/appdetails/", params)
     if not data:
         return {}
     app_data = data.get(appid, {})
@@ -151,6 +276,74 @@ def get_app_details(appid: str) -> dict:
     return {}
 
 
+def get_app_prices(appids: list, deadline: float = None) -> dict:
+    """price_overview for many apps via multi-appid appdetails (only works with
+    filters=price_overview). Returns {appid: price_overview}; free and unpriced
+    apps map to {}, apps whose batch failed (or was not sent by `deadline`) are missing."""
+    url = "https://store.steampowered.com/api/appdetails/"
+    batches = [appids[i:i + APPDETAILS_BATCH] for i in range(0, len(appids), APPDETAILS_BATCH)]
+    prices = {}
+    for batch in batches:
+        if expired(deadline):
+            break
+        data = api_get(url, {"appids": ",".join(batch), "filters": "price_overview", "cc": "us", "l": "english"})
+        for appid, entry in (data or {}).items():
+            if isinstance(entry, dict) and entry.get("success"):
+                # Free/unpriced apps come back as "data": []
+                payload = entry.get("data")
+                prices[appid] = payload.get("price_overview", {}) if isinstance(payload, dict) else {}
+    return prices
+
+
+def normalize_details(details: dict) -> dict:
+    """The static fields enrichment keeps from an appdetails payload."""
+    genre_names = [g.get("description", "") for g in details.get("genres", [])[:3]]
+    genres = [GENRE_NORMALIZE.get(gn, gn) for gn in genre_names]
+    release = details.get("release_date", {})
+    return {
+        "name": details.get("name", ""),
+        "type": details.get("type", "game"),
+        "genres": genres,
+        "is_early_access": "Early Access" in genres,
+        "coming_soon": release.get("coming_soon", False),
+        "release_date": release.get("date", ""),
+        "is_free": bool(details.get("is_free")),
+    }
+
+
+def get_app_metadata(appids: list, max_workers: int = ENRICH_WORKERS, with_prices: bool = True,
+                     deadline: float = None) -> dict:
+    """Normalized metadata for a candidate set: {appid: {static fields..., price_overview}}.
+
+    Static fields come from the app catalog; only missing or stale entries
+    get a filtered per-app appdetails call (those can't be batched), and the
+    results are written back. Prices for the whole set are always fetched
+    fresh in a handful of batched requests. Apps whose static call failed
+    fall back to a stale catalog entry, else only get price_overview (if any).
+    Requests not yet sent by `deadline` (time.monotonic()) are skipped like failed ones.
+    """
+    appids = list(appids)
+    catalog = app_catalog.get_catalog()
+    cached = catalog.get_many(appids)
+    refetch = [a for a in appids if a not in cached or not catalog.is_fresh(cached[a])]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        prices = pool.submit(get_app_prices, appids if with_prices else [], deadline)
+        fetched = dict(zip(refetch, pool.map(
+            lambda a: {} if expired(deadline) else get_app_details(a, APP_STATIC_FILTERS), refetch)))
+    prices = prices.result()
+
+    refreshed = {a: normalize_details(d) for a, d in fetched.items() if d}
+    catalog.put_many(refreshed)
+    metadata = {}
+    for appid in appids:
+        meta = dict(refreshed.get(appid) or cached.get(appid) or {})
+        meta.pop("refreshed_at", None)
+        if appid in prices:
+            meta["price_overview"] = prices[appid]
+        metadata[appid] = meta
+    return metadata
+
+
 def get_review_summary(appid: str) -> dict:
     data = api_get(f"https://store.steampowered.com/appreviews/{appid}", {
         "json": "1",
@@ -170,43 +363,126 @@ def get_review_summary(appid: str) -> dict:
     }
 
 
-def enrich_game(game: dict, api_key: str, fetch_reviews: bool = True) -> dict:
-    appid = game["appid"]
+def remaining(deadline: float) -> float:
+    """Seconds left before a time.monotonic() deadline (None: no deadline)."""
+    return None if deadline is None else max(deadline - time.monotonic(), 0)
 
-    # Player count
-    players = get_current_players(int(appid), api_key)
-    game["players"] = players
-    time.sleep(REQUEST_DELAY)
-
-    # App details
-    details = get_app_details(appid)
-    time.sleep(REQUEST_DELAY)
-
-    if details:
-        game["type"] = details.get("type", "game")
-        genres = details.get("genres", [])
-        genre_names = [g.get("description", "") for g in genres[:3]]
-        game["genres"] = [GENRE_NORMALIZE.get(gn, gn) for gn in genre_names]
-        game["is_early_access"] = "Early Access" in game["genres"]
-        release = details.get("release_date", {})
-        game["coming_soon"] = release.get("coming_soon", False)
-        game["release_date"] = release.get("date", "")
-        if details.get("is_free"):
-            game["is_free"] = True
-            game["price_str"] = "Free"
+
+def expired(deadline: float) -> bool:
+    """True once a time.monotonic() deadline (None: no deadline) has passed."""
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def run_until(deadline: float, fn, *args, default=None, **kwargs):
+    """fn(*args, **kwargs) on a worker thread; `default` if it is still running at
+    the deadline. fn must stop at the deadline itself (it is passed as `deadline=`),
+    since the interpreter waits for the worker before it exits."""
+    pool = ThreadPoolExecutor(max_workers=1)
+    future = pool.submit(fn, *args, deadline=deadline, **kwargs)
+    pool.shutdown(wait=False)
+    try:
+        return future.result(timeout=remaining(deadline))
+    except FutureTimeout:
+        return default
+
+
+def snapshot_fallbacks(snapshot: dict) -> dict:
+    """Last known per-app values from a snapshot, for games enrichment gives up on:
+    {appid: {"players", "price_str", "discount_pct", "review_desc", ...}}."""
+    fallbacks = {}
+    for key in ("trending", "topsellers"):
+        for g in snapshot.get(key, []):
+            if g.get("appid") and g.get("price_str"):
+                fallbacks.setdefault(g["appid"], {}).update(
+                    price_str=g["price_str"], discount_pct=g.get("discount_pct", 0))
+    for appid, players in snapshot.get("player_counts", {}).items():
+        fallbacks.setdefault(appid, {})["players"] = players
+    for appid, rev in snapshot.get("reviews", {}).items():
+        fallbacks.setdefault(appid, {}).update(
+            review_desc=rev.get("desc", ""),
+            review_positive=rev.get("positive", 0),
+            review_negative=rev.get("negative", 0),
+            review_total=rev.get("positive", 0) + rev.get("negative", 0),
+        )
+    return fallbacks
+
+
+def enrich_games(games: dict, api_key: str, fetch_reviews: bool = True,
+                 max_workers: int = ENRICH_WORKERS, most_played: dict = None,
+                 deadline: float = None, fallbacks: dict = None) -> dict:
+    """Enrich {appid: game} concurrently: metadata for the whole set is fetched
+    in batches while player counts and reviews run in parallel across apps;
+    results are applied in the original order. Player counts already on the
+    most-played chart (see get_most_played) are reused instead of refetched.
+
+    Calls are queued in dict order, so the head of each chart goes first. With a
+    `deadline` (time.monotonic()), anything unfinished by then is dropped: static
+    fields come from the app catalog (even if stale), players, price and reviews
+    from `fallbacks` (see snapshot_fallbacks), and game["degraded"] lists the
+    fields that were substituted."""
+    most_played = most_played or {}
+    fallbacks = fallbacks or {}
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    metadata = pool.submit(get_app_metadata, list(games), max_workers, deadline=deadline)
+    pending = []
+    for appid in games:
+        pending.append((
+            appid,
+            None if appid in most_played else pool.submit(get_current_players, int(appid), api_key),
+            pool.submit(get_review_summary, appid) if fetch_reviews else None,
+        ))
+
+    def result(future):
+        try:
+            return future.result(timeout=remaining(deadline))
+        except FutureTimeout:
+            return None
+
+    metadata = result(metadata)
+    if metadata is None:
+        cached = app_catalog.get_catalog().get_many(games)
+    for i, (appid, players, review) in enumerate(pending):
+        game = games[appid]
+        last = fallbacks.get(appid, {})
+        degraded = []
+        players = most_played[appid]["players"] if players is None else result(players)
+        if players is None:
+            players = last.get("players", 0)
+            degraded.append("players")
+        if metadata is not None:
+            meta = metadata.get(appid, {})
         else:
-            game["is_free"] = False
-            price_info = details.get("price_overview", {})
-            if price_info:
-                final_cents = price_info.get("final", 0)
-                currency = price_info.get("currency", "USD")
-                if currency == "USD" and final_cents:
-                    game["price_str"] = f"${final_cents / 100:.2f}"
-                else:
-                    game["price_str"] = price_info.get("final_formatted", game.get("price", ""))
-                game["discount_pct"] = price_info.get("discount_percent", 0)
-            else:
-                game["price_str"] = game.get("price", "")
+            meta = dict(cached.get(appid, {}))
+            degraded.append("price" if meta else "details")
+        if review is not None:
+            review = result(review)
+            if review is None:
+                degraded.append("reviews")
+        apply_enrichment(game, players, meta, review)
+        if "reviews" in degraded and last.get("review_desc"):
+            for field in ("review_desc", "review_positive", "review_negative", "review_total"):
+                game[field] = last[field]
+        if "price" in degraded or "details" in degraded:
+            if last.get("price_str"):
+                game["price_str"] = last["price_str"]
+                game["discount_pct"] = last.get("discount_pct", 0)
+        if degraded:
+            game["degraded"] = degraded
+        print(f"  [{i + 1}/{len(games)}] {game.get('name', appid)}"
+              + (f" (degraded: {', '.join(degraded)})" if degraded else ""))
+    pool.shutdown(wait=False, cancel_futures=True)
+    return games
+
+
+def apply_enrichment(game: dict, players: int, meta: dict, review: dict = None) -> dict:
+    """Merge player count, normalized metadata (see get_app_metadata) and
+    (optional) review summary into game."""
+    game["players"] = players
+
+    has_static = "type" in meta
+    if has_static:
+        for field in ("type", "genres", "is_early_access", "coming_soon", "release_date", "is_free"):
+            game[field] = meta[field]
     else:
         game.setdefault("type", "game")
         game.setdefault("genres", [])
@@ -214,19 +490,56 @@ def enrich_game(game: dict, api_key: str, fetch_reviews: bool = True) -> dict:
         game.setdefault("coming_soon", False)
         game.setdefault("release_date", "")
         game.setdefault("is_free", game.get("price", "").lower() in ("free", "free to play", ""))
+
+    price_info = meta.get("price_overview")
+    if has_static and game["is_free"]:
+        game["price_str"] = "Free"
+    elif price_info:
+        final_cents = price_info.get("final", 0)
+        currency = price_info.get("currency", "USD")
+        if currency == "USD" and final_cents:
+            game["price_str"] = fmt_price(final_cents, currency)
+        else:
+            game["price_str"] = price_info.get("final_formatted", game.get("price", ""))
+        game["discount_pct"] = price_info.get("discount_percent", 0)
+    elif has_static:
+        game["price_str"] = game.get("price", "")
+    else:
         game.setdefault("price_str", game.get("price", ""))
 
-    if fetch_reviews:
-        review = get_review_summary(appid)
+    if review is not None:
         game["review_desc"] = review.get("score_desc", "")
         game["review_positive"] = review.get("total_positive", 0)
         game["review_negative"] = review.get("total_negative", 0)
         game["review_total"] = review.get("total_reviews", 0)
-        time.sleep(REQUEST_DELAY)
 
     return game
 
 
+def chart_movers(current: list, previous: list, skip_top: int = 20,
+                 min_jump: int = MOVER_MIN_JUMP) -> list:
+    """Games that climbed a chart below its head since the previous snapshot.
+
+    current/previous are [[appid, name], ...] in rank order. Returns
+    (appid, name, prev_rank or None, rank, places gained) sorted by places gained; a game
+    new to the chart counts once it lands inside the top (depth - min_jump).
+    """
+    if not previous:
+        return []
+    prev_rank = {appid: i for i, (appid, _) in enumerate(previous, 1)}
+    depth = max(len(previous), len(current))
+    movers = []
+    for rank, (appid, name) in enumerate(current, 1):
+        if rank <= skip_top:
+            continue
+        before = prev_rank.get(appid)
+        gained = (before or depth + 1) - rank
+        if gained >= min_jump:
+            movers.append((appid, name, before, rank, gained))
+    movers.sort(key=lambda m: -m[4])
+    return movers
+
+
 def load_snapshots() -> dict:
     if not SNAPSHOT_FILE.exists():
         return {}
@@ -349,7 +662,44 @@ def format_game_line(i: int, game: dict, prev_players: dict, prev_names: set,
     return f"{i}. {linked_name}{badge_str}{player_str}{price_str}{label_str}"
 
 
-def build_daily_report() -> str:
+def load_watchlist() -> list:
+    """Appids the sampler polls: the most recent snapshot's player_counts plus WATCHLIST_FILE."""
+    snapshots = load_snapshots()
+    appids = list(snapshots[max(snapshots)].get("player_counts", {})) if snapshots else []
+    if WATCHLIST_FILE.exists():
+        with open(WATCHLIST_FILE, encoding="utf-8") as f:
+            appids.extend(str(a) for a in json.load(f))
+    return list(dict.fromkeys(appids))
+
+
+def sample_players(api_key: str, max_workers: int = ENRICH_WORKERS) -> int:
+    """One sampling pass: most-played chart plus per-app counts for the rest of
+    the watchlist, written to player_series. Returns the number of apps sampled."""
+    counts = {aid: m["players"] for aid, m in get_most_played().items()}
+    rest = [aid for aid in load_watchlist() if aid not in counts]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for aid, players in zip(rest, pool.map(lambda a: get_current_players(int(a), api_key), rest)):
+            if players > 0:
+                counts[aid] = players
+    series = player_series.get_series()
+    series.record(counts)
+    series.prune()
+    return len(counts)
+
+
+def run_sampler(every_minutes: float = 0):
+    """--sample: one pass (for cron), or a pass every `every_minutes` until interrupted."""
+    api_key = load_api_key()
+    while True:
+        started = time.monotonic()
+        n = sample_players(api_key)
+        print(f"{datetime.now():%Y-%m-%d %H:%M} sampled {n} apps")
+        if not every_minutes:
+            return
+        time.sleep(max(every_minutes * 60 - (time.monotonic() - started), 0))
+
+
+def build_daily_report(regions: list = None) -> str:
     api_key = load_api_key()
     snapshots = load_snapshots()
     previous = get_previous_snapshot(snapshots)
@@ -358,39 +708,54 @@ def build_daily_report() -> str:
     prev_topseller_names = {g["name"] for g in previous.get("topsellers", [])}
     prev_reviews = previous.get("reviews", {})
 
-    # Fetch lists
-    print("Fetching New & Trending...")
-    trending_raw = get_search_results("popularnew", 20)
-    time.sleep(REQUEST_DELAY)
-
-    print("Fetching Top Sellers...")
-    topsellers_raw = get_search_results("topsellers", 25)
-    time.sleep(REQUEST_DELAY)
-
-    print("Fetching Most Wishlisted...")
-    wishlisted_raw = get_search_results("popularwishlist", 10)
-    time.sleep(REQUEST_DELAY)
+    # Regional charts load in the background while the US lists are fetched and enriched
+    region_pool = ThreadPoolExecutor(max_workers=1)
+    region_future = region_pool.submit(fetch_regions, regions or [])
+    if regions:
+        print(f"Fetching {len(regions)} regions in the background ({', '.join(regions)})...")
 
+    # Fetch lists: charts come from search (featured categories only if search is down)
     print("Fetching Featured Categories...")
     featured = get_featured_categories()
-    time.sleep(REQUEST_DELAY)
+
+    print("Fetching New & Trending, Top Sellers and Most Wishlisted...")
+    with ThreadPoolExecutor(max_workers=len(CHART_DEPTH)) as pool:
+        charts = {f: pool.submit(get_chart, f, depth, featured) for f, depth in CHART_DEPTH.items()}
+    trending_raw, trending_source, trending_ranked = charts["popularnew"].result()
+    topsellers_raw, topsellers_source, topsellers_ranked = charts["topsellers"].result()
+    wishlisted_raw, wishlisted_source, wishlisted_ranked = charts["popularwishlist"].result()
+
+    print("Fetching Most Played chart...")
+    most_played = get_most_played()
 
     # Collect unique appids to enrich
     all_games = {}
-    for g in trending_raw[:15]:
+    for g in trending_raw[:TRENDING_LIMIT]:
         all_games.setdefault(g["appid"], g)
-    for g in topsellers_raw[:20]:
+    for g in topsellers_raw[:TOPSELLERS_LIMIT]:
         all_games.setdefault(g["appid"], g)
 
-    print(f"Enriching {len(all_games)} unique games (details + players + reviews)...")
-    for i, (appid, game) in enumerate(all_games.items()):
-        print(f"  [{i + 1}/{len(all_games)}] {game.get('name', appid)}")
-        enrich_game(game, api_key, fetch_reviews=True)
+    deadline = time.monotonic() + ENRICH_BUDGET
+    print(f"Enriching {len(all_games)} unique games (details + players + reviews, {ENRICH_BUDGET}s budget)...")
+    enrich_games(all_games, api_key, fetch_reviews=True, most_played=most_played,
+                 deadline=deadline, fallbacks=snapshot_fallbacks(previous))
+    degraded = {aid: g["degraded"] for aid, g in all_games.items() if g.get("degraded")}
+
+    print("Ingesting new reviews since last run...")
+    review_velocity = run_until(deadline, review_tracker.ingest_many, all_games,
+                                headers={"User-Agent": "SteamTrendingBot/3.0"}, default={})
+    review_velocity = {aid: list(v) for aid, v in review_velocity.items() if v}
+
+    # Most-played games off our lists only need names (catalog-backed; usually no requests)
+    chart_only = [aid for aid in most_played if aid not in all_games]
+    chart_meta = run_until(deadline, get_app_metadata, chart_only, with_prices=False)
+    if chart_meta is None:
+        chart_meta = app_catalog.get_catalog().get_many(chart_only)
 
     # Split trending into released vs unreleased
     trending = []
     unreleased_trending = []
-    for g in trending_raw[:15]:
+    for g in trending_raw[:TRENDING_LIMIT]:
         enriched = all_games.get(g["appid"], g)
         if enriched.get("coming_soon"):
             unreleased_trending.append(enriched)
@@ -401,7 +766,7 @@ def build_daily_report() -> str:
     topsellers_paid = []
     topsellers_free = []
     unreleased_sellers = []
-    for g in topsellers_raw[:20]:
+    for g in topsellers_raw[:TOPSELLERS_LIMIT]:
         enriched = all_games.get(g["appid"], g)
         if enriched.get("coming_soon"):
             unreleased_sellers.append(enriched)
@@ -414,19 +779,35 @@ def build_daily_report() -> str:
     unreleased_all = {g["appid"]: g for g in unreleased_trending + unreleased_sellers}
 
     # Extract specials from featured
-    specials = []
-    if featured:
-        for item in featured.get("specials", {}).get("items", []):
-            if not is_blacklisted(str(item.get("id", "")), item.get("name", "")):
-                specials.append({
-                    "appid": str(item.get("id", "")),
-                    "name": item.get("name", "Unknown"),
-                    "discount": item.get("discount_percent", 0),
-                    "final": item.get("final_price", 0),
-                })
+    specials = extract_specials(featured)
+    sources = {
+        "trending": trending_source,
+        "topsellers": topsellers_source,
+        "wishlisted": wishlisted_source,
+        "specials": f"featured {len(specials)}" if specials else "unavailable",
+    }
+
+    region_data = region_future.result()
+    region_pool.shutdown()
+    us_sellers = [[g["appid"], g["name"]] for g in topsellers_raw]
+    # A cut-short US chart would count everything past its end as unranked in the US
+    region_diffs = {cc: regional_rank_diff(us_sellers, data["topsellers"])[:10]
+                    for cc, data in region_data.items()} if topsellers_ranked else {}
 
     # Save snapshot
-    player_counts = {aid: g.get("players", 0) for aid, g in all_games.items() if g.get("players", 0) > 0}
+    player_counts = {aid: m["players"] for aid, m in most_played.items() if m["players"] > 0}
+    player_counts.update({aid: g.get("players", 0) for aid, g in all_games.items()
+                          if g.get("players", 0) > 0 and "players" not in g.get("degraded", [])})
+    player_peaks = {aid: m["peak"] for aid, m in most_played.items() if m["peak"] > 0}
+
+    # Report time is a sample too; with the sampler running, movers compare 24h averages
+    # (only for apps with MIN_AVG_SAMPLES in each window: one report-time sample is no average)
+    series = player_series.get_series()
+    series.record(player_counts)
+    player_stats = {aid: list(st) for aid, st in
+                    series.trailing(player_counts, 24, min_samples=MIN_AVG_SAMPLES).items()}
+    prev_stats = series.trailing(player_counts, 24, end=datetime.now() - timedelta(hours=24),
+                                 min_samples=MIN_AVG_SAMPLES)
     reviews_snapshot = {}
     for aid, g in all_games.items():
         if g.get("review_desc"):
@@ -436,6 +817,19 @@ def build_daily_report() -> str:
                 "negative": g.get("review_negative", 0),
             }
 
+    # Full-depth search chart positions: [[appid, name], ...] in rank order. A chart that
+    # fell back to featured categories or stopped at a failed page is left empty, so
+    # movers never compare two rankings or a cut-short chart
+    def ranks(rows, ranked):
+        return [[g["appid"], g["name"]] for g in rows] if ranked else []
+
+    chart_ranks = {
+        "trending": ranks(trending_raw, trending_ranked),
+        "topsellers": ranks(topsellers_raw, topsellers_ranked),
+        "wishlisted": ranks(wishlisted_raw, wishlisted_ranked),
+    }
+    prev_ranks = previous.get("chart_ranks", {})
+
     # Build enriched game details for snapshot
     def game_detail(g):
         return {
@@ -453,15 +847,23 @@ def build_daily_report() -> str:
         }
 
     save_snapshot({
-        "trending": [game_detail(all_games.get(g["appid"], g)) for g in trending_raw[:15]],
-        "topsellers": [game_detail(all_games.get(g["appid"], g)) for g in topsellers_raw[:20]],
+        "trending": [game_detail(all_games.get(g["appid"], g)) for g in trending_raw[:TRENDING_LIMIT]],
+        "topsellers": [game_detail(all_games.get(g["appid"], g)) for g in topsellers_raw[:TOPSELLERS_LIMIT]],
         "topsellers_paid": [game_detail(g) for g in topsellers_paid[:10]],
         "topsellers_free": [game_detail(g) for g in topsellers_free[:10]],
         "wishlisted": [{"name": g["name"], "appid": g.get("appid", "")} for g in wishlisted_raw[:10]],
         "specials": specials[:10],
         "unreleased": [game_detail(g) for g in unreleased_all.values()],
         "player_counts": player_counts,
+        "player_peaks": player_peaks,
+        "player_stats": player_stats,
         "reviews": reviews_snapshot,
+        "review_velocity": review_velocity,
+        "chart_ranks": chart_ranks,
+        "regions": region_data,
+        "region_rank_diff": region_diffs,
+        "sources": sources,
+        "degraded": degraded,
         "date": datetime.now().isoformat(),
     })
 
@@ -499,11 +901,20 @@ def build_daily_report() -> str:
         lines.append("")
 
     # --- PLAYER COUNT MOVERS (day-over-day) ---
-    if prev_players:
+    # 24h average vs the previous 24h once the sampler has filled both windows; else report-time counts
+    use_avg = any(aid in player_stats for aid in prev_stats)
+    if use_avg:
+        current_counts = {aid: player_stats[aid][1] for aid in prev_stats if aid in player_stats}
+        previous_counts = {aid: prev_stats[aid][1] for aid in current_counts}
+    else:
+        current_counts, previous_counts = player_counts, prev_players
+    basis = "24h-average {} vs previous 24h" if use_avg else "player {} vs yesterday"
+    if previous_counts:
         movers = []
-        name_lookup = {aid: g.get("name", f"App {aid}") for aid, g in all_games.items()}
-        for appid, count in player_counts.items():
-            prev_p = prev_players.get(appid, 0)
+        name_lookup = {aid: m["name"] for aid, m in chart_meta.items() if m.get("name")}
+        name_lookup.update({aid: g.get("name", f"App {aid}") for aid, g in all_games.items()})
+        for appid, count in current_counts.items():
+            prev_p = previous_counts.get(appid, 0)
             if prev_p > 100:
                 abs_change = count - prev_p
                 pct = ((count - prev_p) / prev_p) * 100
@@ -511,22 +922,34 @@ def build_daily_report() -> str:
 
         rising = sorted([m for m in movers if m[3] > 0], key=lambda x: x[3], reverse=True)
         if rising:
-            lines.append("RISING (biggest player gains vs yesterday)")
+            lines.append(f"RISING (biggest {basis.format('gains')})")
             lines.append("-" * 30)
             for appid, count, prev_p, abs_change, pct in rising[:6]:
                 name = name_lookup.get(appid, f"App {appid}")
-                lines.append(f"  +{fmt_num(abs_change)} ({pct:+.0f}%) {name} ({fmt_num(prev_p)} -> {fmt_num(count)})")
+                peak = f", peak {fmt_num(player_stats[appid][0])}" if use_avg else ""
+                lines.append(f"  +{fmt_num(abs_change)} ({pct:+.0f}%) {name} ({fmt_num(prev_p)} -> {fmt_num(count)}{peak})")
             lines.append("")
 
         falling = sorted([m for m in movers if m[4] < -15], key=lambda x: x[4])
         if falling:
-            lines.append("FALLING (biggest player drops vs yesterday)")
+            lines.append(f"FALLING (biggest {basis.format('drops')})")
             lines.append("-" * 30)
             for appid, count, prev_p, abs_change, pct in falling[:5]:
                 name = name_lookup.get(appid, f"App {appid}")
                 lines.append(f"  {fmt_num(abs_change)} ({pct:+.0f}%) {name} ({fmt_num(prev_p)} -> {fmt_num(count)})")
             lines.append("")
 
+    # --- CHART MOVERS (climbing below the top sellers we enrich) ---
+    climbers = chart_movers(chart_ranks["topsellers"], prev_ranks.get("topsellers", []),
+                            skip_top=TOPSELLERS_LIMIT)
+    if climbers:
+        lines.append(f"CHART MOVERS (climbing the top {len(chart_ranks['topsellers'])} sellers)")
+        lines.append("-" * 30)
+        for appid, name, before, rank, _ in climbers[:6]:
+            was = f"#{before}" if before else "unranked"
+            lines.append(f"  {was} -> #{rank} {steam_link(name, appid)}")
+        lines.append("")
+
     # --- NEW ENTRIES TODAY ---
     if prev_trending_names or prev_topseller_names:
         new_in_trending = [g for g in trending if g.get("name", "") not in prev_trending_names]
@@ -563,7 +986,21 @@ def build_daily_report() -> str:
         if prev_desc and prev_desc != desc:
             review_entries.append(
                 f"  {link}: {prev_desc} -> {desc} ({fmt_num(curr_total)} reviews)")
-        # Sharp review count spike (>20% more reviews in one day = lots of new players reviewing)
+        elif aid in review_velocity:
+            # Reviews posted since the last run (review_tracker), vs lifetime sentiment
+            pos, neg = review_velocity[aid]
+            new_reviews = pos + neg
+            lifetime_pct = 100 * g.get("review_positive", 0) / curr_total if curr_total else 0
+            recent_pct = 100 * pos / new_reviews if new_reviews else 0
+            if new_reviews >= REVIEW_SWING_MIN_REVIEWS and abs(recent_pct - lifetime_pct) >= REVIEW_SWING_POINTS:
+                review_entries.append(
+                    f"  {link}: sentiment swing, {recent_pct:.0f}% positive in {fmt_num(new_reviews)} new reviews "
+                    f"vs {lifetime_pct:.0f}% lifetime ({desc})")
+            elif new_reviews >= max(REVIEW_SPIKE_MIN, REVIEW_SPIKE_SHARE * curr_total):
+                review_entries.append(
+                    f"  {link}: +{fmt_num(new_reviews)} new reviews since last run ({recent_pct:.0f}% positive, "
+                    f"{desc}, {fmt_num(curr_total)} total)")
+        # No review history yet: fall back to the lifetime-total jump (>20% more reviews in one day)
         elif prev_total > 100 and curr_total > prev_total * 1.2:
             new_reviews = curr_total - prev_total
             review_entries.append(
@@ -572,7 +1009,7 @@ def build_daily_report() -> str:
     if review_entries:
         lines.append("REVIEW SPOTLIGHT (changes only)")
         lines.append("-" * 30)
-        for entry in review_entries:
+        for entry in review_entries[:8]:
             lines.append(entry)
         lines.append("")
 
@@ -586,11 +1023,29 @@ def build_daily_report() -> str:
             appid = deal.get("appid", "")
             disc = deal.get("discount", 0)
             final = deal.get("final", 0)
-            price_str = f" (${final / 100:.2f})" if final else ""
+            price_str = f" ({fmt_price(final, deal.get('currency', 'USD'))})" if final else ""
             linked = steam_link(name, appid) if appid else name
             lines.append(f"  -{disc}% {linked}{price_str}")
         lines.append("")
 
+    # --- REGIONS (--regions): local top sellers and games charting far above the US ---
+    for cc, data in region_data.items():
+        if not data["topsellers"]:
+            continue
+        lines.append(f"REGION {cc.upper()} - TOP SELLERS")
+        lines.append("-" * 30)
+        for i, (appid, name, price, discount) in enumerate(data["topsellers"][:5], 1):
+            price_str = f" | {price}" if price else ""
+            disc_str = f" (-{discount}%)" if discount else ""
+            lines.append(f"  {i}. {steam_link(name, appid)}{price_str}{disc_str}")
+        standouts = region_diffs.get(cc, [])[:3]
+        if standouts:
+            lines.append("  Charting higher than in the US:")
+            for appid, name, rank, us_rank in standouts:
+                us = f"US #{us_rank}" if us_rank else "not in US top " + str(len(us_sellers))
+                lines.append(f"    #{rank} {steam_link(name, appid)} ({us})")
+        lines.append("")
+
     # --- MOST WISHLISTED (upcoming games by wishlist popularity) ---
     if wishlisted_raw:
         lines.append("MOST WISHLISTED (upcoming, ranked by wishlist popularity)")
@@ -649,6 +1104,14 @@ def build_daily_report() -> str:
                 lines.append(f"  -> {steam_link(name, appid)} -- {fmt_num(players)} players")
                 seen.add(name)
 
+    # Where each list came from (search pages, or the featured categories fallback)
+    lines.append("")
+    lines.append("Sources: " + " | ".join(f"{label}: {sources[key]}" for key, label in (
+        ("trending", "New & Trending"), ("topsellers", "Top Sellers"),
+        ("wishlisted", "Most Wishlisted"), ("specials", "Deals"))))
+    if degraded:
+        lines.append(f"Enrichment budget ({ENRICH_BUDGET}s) ran out: {len(degraded)} games use "
+                     f"cached or last-snapshot values")
     lines.append("")
     return "\n".join(lines)
 
@@ -689,10 +1152,10 @@ def build_summary_report(period: str) -> str:
             if name:
                 all_topseller_names[name] = all_topseller_names.get(name, 0) + 1
 
-    name_lookup = {}
+    name_lookup = app_catalog.get_catalog().names()
     for g in last_snap.get("trending", []) + last_snap.get("topsellers", []):
         if g.get("appid") and g.get("name"):
-            name_lookup[g["appid"]] = g["name"]
+            name_lookup.setdefault(g["appid"], g["name"])  # snapshots predating the catalog
 
     lines.append("MOST CONSISTENT TRENDING")
     lines.append("-" * 30)
@@ -779,24 +1242,46 @@ def build_summary_report(period: str) -> str:
             lines.append(s)
         lines.append("")
 
+    tracked = set(first_reviews) | set(last_reviews)
+    velocity = review_tracker.get_store().totals(tracked, cutoff)
+    busiest = sorted(((a, v) for a, v in velocity.items() if sum(v)), key=lambda x: -(x[1][0] + x[1][1]))
+    if busiest:
+        lines.append(f"REVIEW VELOCITY ({period.upper()}, new reviews)")
+        lines.append("-" * 30)
+        for appid, (pos, neg) in busiest[:8]:
+            name = name_lookup.get(appid, f"App {appid}")
+            lines.append(f"  {name}: +{fmt_num(pos + neg)} ({100 * pos / max(pos + neg, 1):.0f}% positive)")
+        lines.append("")
+
     lines.append("")
     return "\n".join(lines)
 
 
-def build_report(mode: str = "daily") -> str:
+def build_report(mode: str = "daily", regions: list = None) -> str:
     if mode in ("weekly", "monthly"):
         return build_summary_report(mode)
-    return build_daily_report()
+    return build_daily_report(regions)
 
 
 if __name__ == "__main__":
+    if "--sample" in sys.argv:
+        every = float(sys.argv[sys.argv.index("--every") + 1]) if "--every" in sys.argv else 0
+        run_sampler(every)
+        sys.exit(0)
+
     mode = "daily"
     if "--weekly" in sys.argv:
         mode = "weekly"
     elif "--monthly" in sys.argv:
         mode = "monthly"
 
-    report = build_report(mode)
+    regions = None
+    if "--regions" in sys.argv:
+        i = sys.argv.index("--regions")
+        arg = sys.argv[i + 1] if i + 1 < len(sys.argv) and not sys.argv[i + 1].startswith("--") else ""
+        regions = [cc.strip().lower() for cc in arg.split(",") if cc.strip()] or REGIONS
+
+    report = build_report(mode, regions)
     output_file = Path(__file__).parent / "steam_trending_output.txt"
     output_file.write_text(report, encoding="utf-8")
     print(f"\nReport saved to {output_file}")
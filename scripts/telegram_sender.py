@@ -5,14 +5,18 @@ Loads credentials from ~/.openclaw/credentials/telegram-bot.json
 """
 
 import json
-import time
-import urllib.request
-import urllib.parse
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 CREDS_FILE = Path.home() / ".openclaw" / "credentials" / "telegram-bot.json"
-with open(CREDS_FILE, "r", encoding="utf-8") as _f:
-    _creds = json.load(_f)
+if http_client.credentials_optional() and not CREDS_FILE.exists():
+    _creds = {"bot_token": "replay", "chat_id": "replay"}
+else:
+    with open(CREDS_FILE, "r", encoding="utf-8") as _f:
+        _creds = json.load(_f)
 BOT_TOKEN = _creds["bot_token"]
 CHAT_ID = _creds["chat_id"]
 MAX_MSG_LEN = 4000
@@ -29,30 +33,21 @@ def send_telegram(text: str, parse_mode: str = "HTML"):
         }
         if parse_mode:
             params['parse_mode'] = parse_mode
-        data = urllib.parse.urlencode(params).encode('utf-8')
         url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-        for attempt in range(3):
-            req = urllib.request.Request(url, data=data)
-            try:
-                resp = urllib.request.urlopen(req, timeout=30)
-                result = json.loads(resp.read())
-                if not result.get('ok'):
-                    print(f"Telegram API error: {result}")
-                    if parse_mode and 'parse' in str(result).lower():
-                        plain_params = {
-                            'chat_id': CHAT_ID,
-                            'text': chunk,
-                            'disable_web_page_preview': 'true',
-                        }
-                        plain_data = urllib.parse.urlencode(plain_params).encode('utf-8')
-                        plain_req = urllib.request.Request(url, data=plain_data)
-                        urllib.request.urlopen(plain_req, timeout=30)
-                break
-            except Exception as e:
-                print(f"Telegram send attempt {attempt + 1} failed: {e}")
-                if attempt < 2:
-                    time.sleep(2)
-        time.sleep(0.5)
+        try:
+            # Retries with backoff (and the breaker for api.telegram.org) live in http_client
+            result = http_client.post_json(url, params, retries=2)
+            if not result.get('ok'):
+                print(f"Telegram API error: {result}")
+                if parse_mode and 'parse' in str(result).lower():
+                    plain_params = {
+                        'chat_id': CHAT_ID,
+                        'text': chunk,
+                        'disable_web_page_preview': 'true',
+                    }
+                    http_client.request("POST", url, data=plain_params, retries=2)
+        except Exception as e:
+            print(f"Telegram send failed: {e}")
 
 
 def split_message(text: str) -> list:
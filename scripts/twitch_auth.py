@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Twitch app access token store — shared by the Helix and IGDB fetchers.
+Client-credential tokens live ~60 days, so the token and its expiry are kept in
+~/.openclaw/credentials/twitch-token.json and reused across runs. The token is
+refreshed shortly before it expires, and again whenever an API answers 401.
+With overridden upstreams the token is kept in memory only, and under cassette
+replay no token is fetched at all (recorded runs may have reused a stored one).
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import cassette
+import http_client
+
+TOKEN_URL = "https://id.twitch.tv/oauth2/token"
+TOKEN_FILE = Path.home() / ".openclaw" / "credentials" / "twitch-token.json"
+REFRESH_MARGIN = 24 * 3600  # refresh when less than this is left (seconds)
+
+
+class TokenStore:
+    def __init__(self, client_id, client_secret, path=TOKEN_FILE):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.path = None if http_client.credentials_optional() else Path(path)
+        self.token = None
+        self.expires_at = 0.0
+        self.lock = threading.Lock()
+        if cassette.replaying():
+            self.token, self.expires_at = "replay", float("inf")
+        else:
+            self._load()
+
+    def _load(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        if saved.get("client_id") == self.client_id and saved.get("access_token"):
+            self.token = saved["access_token"]
+            self.expires_at = float(saved.get("expires_at", 0))
+
+    def _save(self):
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"client_id": self.client_id, "access_token": self.token,
+                       "expires_at": self.expires_at}, f)
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, self.path)
+
+    def _refresh(self):
+        print("Authenticating with Twitch...", file=sys.stderr)
+        resp = http_client.post_json(TOKEN_URL, {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "grant_type": "client_credentials"
+        })
+        self.token = resp["access_token"]
+        self.expires_at = time.time() + float(resp.get("expires_in", 0))
+        self._save()
+
+    def get(self):
+        """Current access token, fetching a new one if missing or about to expire."""
+        with self.lock:
+            if not self.token or time.time() > self.expires_at - REFRESH_MARGIN:
+                self._refresh()
+            return self.token
+
+    def invalidate(self, token):
+        """Drop `token` after a 401 (unless another thread already replaced it)."""
+        with self.lock:
+            if self.token == token:
+                self.token = None
+                self.expires_at = 0.0
+
+    def call(self, fn):
+        """Run fn(token); on a 401 refresh the token once and retry."""
+        token = self.get()
+        try:
+            return fn(token)
+        except http_client.HttpError as e:
+            if e.status != 401:
+                raise
+        self.invalidate(token)
+        return fn(self.get())
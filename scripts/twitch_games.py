@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Twitch game ids and the compact per-day game arrays in gaming_trends snapshots.
+
+Twitch category ids survive renames, so the daily snapshots and viewer_series
+store integer ids only, and one shared table (game_names.json) keeps the latest
+name seen for each id. A snapshot day keeps its games as parallel int lists:
+  {"game_ids": [...], "viewers": [...], "streams": [...], "ranked": n}
+The first `ranked` ids are that day's top listing in rank order. The rest are
+the other games the streams sweep saw. To compare days, align() scatters them
+onto one sorted id axis, so day-over-day joins and sparklines walk columns of
+arrays instead of looking up names in dicts.
+"""
+
+import json
+import os
+import threading
+from array import array
+from pathlib import Path
+
+NAMES_FILE = Path(__file__).parent / "gaming_trends_data" / "game_names.json"
+
+_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+
+
+class GameNames:
+    def __init__(self, path=NAMES_FILE):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self._names = None
+
+    def _load(self):
+        if self._names is None:
+            raw = json.loads(self.path.read_text(encoding="utf-8")) if self.path.exists() else {}
+            self._names = {int(gid): name for gid, name in raw.items()}
+        return self._names
+
+    def all(self):
+        """{game id: latest known name}."""
+        with self.lock:
+            return dict(self._load())
+
+    def name(self, game_id):
+        with self.lock:
+            return self._load().get(int(game_id)) or f"#{game_id}"
+
+    def ids_by_name(self):
+        """{lowercased name: game id}, for snapshots written before ids were stored."""
+        return {name.lower(): gid for gid, name in self.all().items()}
+
+    def update(self, names):
+        """Record {game id: name}; rewrites the table only when something changed."""
+        names = {int(gid): name for gid, name in names.items() if name}
+        with self.lock:
+            known = self._load()
+            if all(known.get(gid) == name for gid, name in names.items()):
+                return
+            known.update(names)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({str(g): n for g, n in sorted(known.items())}, ensure_ascii=False),
+                           encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+_names = None
+_names_lock = threading.Lock()
+
+
+def get_names():
+    global _names
+    with _names_lock:
+        if _names is None:
+            _names = GameNames()
+        return _names
+
+
+# ── Snapshot arrays ──────────────────────────────────────────────────────────
+
+def pack(ranked, others=()):
+    """Snapshot fields for [(game id, viewers, streams), ...]: the ranked listing
+    first, then `others` (ids already stored are skipped)."""
+    rows = {}
+    for gid, viewers, streams in ranked:
+        rows.setdefault(int(gid), (int(viewers), int(streams)))
+    count = len(rows)
+    for gid, viewers, streams in others:
+        rows.setdefault(int(gid), (int(viewers), int(streams)))
+    return {
+        "game_ids": list(rows),
+        "viewers": [v for v, _ in rows.values()],
+        "streams": [s for _, s in rows.values()],
+        "ranked": count,
+    }
+
+
+class Day:
+    """One snapshot's games as parallel arrays (see pack())."""
+
+    def __init__(self, ids=(), viewers=(), streams=(), ranked=0):
+        self.ids = array(_TYPECODE, ids)
+        self.viewers = array(_TYPECODE, viewers)
+        self.streams = array(_TYPECODE, streams)
+        self.ranked = ranked
+
+    @property
+    def top(self):
+        return self.ids[:self.ranked]
+
+
+def day_arrays(snapshot, ids_by_name=None):
+    """Day for a snapshot. Snapshots from before ids were stored (name-keyed dicts)
+    are mapped through `ids_by_name` (GameNames.ids_by_name()); unknown names are dropped."""
+    if "game_ids" in snapshot:
+        return Day(snapshot["game_ids"], snapshot.get("viewers", []), snapshot.get("streams", []),
+                   snapshot.get("ranked", len(snapshot["game_ids"])))
+    ids_by_name = ids_by_name or {}
+    viewers, streams = snapshot.get("viewers", {}), snapshot.get("streams", {})
+
+    def rows(names):
+        return [(ids_by_name[n.lower()], viewers.get(n, 0), streams.get(n, 0))
+                for n in names if n.lower() in ids_by_name]
+
+    packed = pack(rows(snapshot.get("top_game_names", [])), rows(viewers))
+    return Day(packed["game_ids"], packed["viewers"], packed["streams"], packed["ranked"])
+
+
+def align(days, extra_ids=()):
+    """(axis, viewer columns, stream columns): `axis` is the sorted union of the days'
+    ids (plus extra_ids), and column k holds day k's values along it (0 = absent)."""
+    axis = array(_TYPECODE, sorted(set().union(extra_ids, *(d.ids for d in days))))
+    index = {gid: i for i, gid in enumerate(axis)}
+    viewer_cols, stream_cols = [], []
+    for day in days:
+        viewers, streams = array(_TYPECODE, [0]) * len(axis), array(_TYPECODE, [0]) * len(axis)
+        for gid, v, s in zip(day.ids, day.viewers, day.streams):
+            i = index[gid]
+            viewers[i], streams[i] = v, s
+        viewer_cols.append(viewers)
+        stream_cols.append(streams)
+    return axis, viewer_cols, stream_cols
+
+
+def gather(day, ids, field="viewers"):
+    """`day`'s `field` values at each of `ids` (0 where absent), as an array."""
+    at = dict(zip(day.ids, getattr(day, field)))
+    return array(_TYPECODE, [at.get(int(gid), 0) for gid in ids])
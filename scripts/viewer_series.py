@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Compact Twitch viewership time series per game — written by the intra-day
+sampler (gaming_trends.py --sample), read by the summary reports and the
+dashboard.
+
+Storage is flat arrays of 32-bit ints, one row per Twitch game id (row numbers
+are assigned once in gameids.json and never reused; names live in the shared
+twitch_games table):
+  raw-YYYY-MM-DD.u32  SLOTS_PER_DAY x (viewers + 1, streams + 1) per row
+  daily-YYYY.u32      366 days x (samples, viewer sum, viewer peak, stream sum) per row
+A raw 0 (a file hole) means "no sample". Each sample updates its day's rollup
+in place (replacing the slot's previous sample, if any), so rollups rescan
+raw data only to lower a peak that the replaced sample set. Hours watched count each sample as SLOT_MINUTES of viewing.
+Raw days are kept for RAW_RETENTION_DAYS; the daily rollups are kept forever.
+The sampler and the reports write from separate processes, so record() holds
+a file lock (file_lock) as well as the in-process lock.
+"""
+
+import json
+import os
+import threading
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import file_lock
+import twitch_games
+
+SERIES_DIR = Path(__file__).parent / "gaming_trends_data" / "viewer_series"
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+RAW_RETENTION_DAYS = 14
+DAYS_PER_YEAR = 366
+RAW_WIDTH = 2    # viewers, streams
+DAILY_WIDTH = 4  # samples, viewer sum, viewer peak, stream sum
+MIN_DAY_SAMPLES = 6  # samples before a day's rollup stands for it (the daily report alone adds one)
+
+_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+_ITEM = 4
+
+
+def _read_at(f, offset, count):
+    """`count` ints at item `offset` of an open file (holes/EOF read as 0)."""
+    f.seek(offset * _ITEM)
+    data = f.read(count * _ITEM)
+    values = array(_TYPECODE)
+    values.frombytes(data[:len(data) - len(data) % _ITEM])
+    values.extend([0] * (count - len(values)))
+    return values
+
+
+def _write_at(f, offset, values):
+    f.seek(offset * _ITEM)
+    f.write(array(_TYPECODE, values).tobytes())
+
+
+def _open(path):
+    return open(path, "r+b" if path.exists() else "w+b")
+
+
+class ViewerSeries:
+    def __init__(self, root=SERIES_DIR):
+        self.root = Path(root)
+        self.lock = threading.Lock()
+        self._rows = None
+
+    # ── Row index ────────────────────────────────────────────────────────────
+
+    def _index(self):
+        if self._rows is None:
+            path = self.root / "gameids.json"
+            ids = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+            self._rows = {int(gid): i for i, gid in enumerate(ids)}
+        return self._rows
+
+    def _assign_rows(self, game_ids):
+        rows = self._index()
+        if any(g not in rows for g in game_ids):
+            self._rows = None  # another process (sampler vs. report) may have added rows
+            rows = self._index()
+        new = [g for g in dict.fromkeys(game_ids) if g not in rows]
+        if new:
+            for gid in new:
+                rows[gid] = len(rows)
+            self._replace("gameids.json", sorted(rows, key=rows.get))
+        return rows
+
+    def _replace(self, name, data):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / name
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, path)
+
+    # ── Writing ──────────────────────────────────────────────────────────────
+
+    def record(self, samples, names=None, when=None):
+        """Store {game_id: (viewers, streams)} in the slot for `when` (default now)
+        and fold it into that day's rollup."""
+        when = when or datetime.now()
+        slot = (when.hour * 60 + when.minute) // SLOT_MINUTES
+        doy = when.timetuple().tm_yday - 1
+        with self.lock, file_lock.locked(self.root / ".lock"):
+            rows = self._assign_rows([int(g) for g in samples])
+            self.root.mkdir(parents=True, exist_ok=True)
+            with _open(self.root / f"raw-{when:%Y-%m-%d}.u32") as raw, \
+                    _open(self.root / f"daily-{when.year}.u32") as daily:
+                for gid, (viewers, streams) in samples.items():
+                    viewers, streams = max(int(viewers), 0), max(int(streams), 0)
+                    row = rows[int(gid)]
+                    raw_at = (row * SLOTS_PER_DAY + slot) * RAW_WIDTH
+                    old_viewers, old_streams = _read_at(raw, raw_at, RAW_WIDTH)
+                    _write_at(raw, raw_at, [viewers + 1, streams + 1])
+                    daily_at = (row * DAYS_PER_YEAR + doy) * DAILY_WIDTH
+                    count, viewer_sum, peak, stream_sum = _read_at(daily, daily_at, DAILY_WIDTH)
+                    if old_viewers:  # slot sampled twice: the new sample replaces the old one
+                        viewer_sum -= old_viewers - 1
+                        stream_sum -= old_streams - 1
+                        if old_viewers - 1 == peak and viewers < peak:  # the old sample was the peak
+                            day_raw = _read_at(raw, row * SLOTS_PER_DAY * RAW_WIDTH, SLOTS_PER_DAY * RAW_WIDTH)
+                            peak = max(v - 1 for v in day_raw[::RAW_WIDTH] if v)
+                    else:
+                        count += 1
+                    _write_at(daily, daily_at, [count, viewer_sum + viewers, max(peak, viewers),
+                                                stream_sum + streams])
+        if names:
+            twitch_games.get_names().update(names)
+
+    def prune(self, today=None):
+        """Delete raw day files older than RAW_RETENTION_DAYS (rollups are kept)."""
+        cutoff = f"raw-{(today or datetime.now().date()) - timedelta(days=RAW_RETENTION_DAYS):%Y-%m-%d}.u32"
+        for path in self.root.glob("raw-*.u32"):
+            if path.name < cutoff:
+                path.unlink()
+
+    # ── Reading ──────────────────────────────────────────────────────────────
+
+    def daily(self, game_ids, days, min_samples=1):
+        """{game_id: {"YYYY-MM-DD": {"peak", "avg", "hours_watched", "avg_streams", "samples"}}}
+        for the given dates; all known games when game_ids is None. Days with fewer
+        than `min_samples` samples are left out."""
+        rows = self._index()
+        if game_ids is None:
+            game_ids = list(rows)
+        result = {}
+        handles = {}
+        try:
+            for gid in game_ids:
+                row = rows.get(int(gid))
+                if row is None:
+                    continue
+                per_day = {}
+                for day in days:
+                    if day.year not in handles:
+                        path = self.root / f"daily-{day.year}.u32"
+                        handles[day.year] = open(path, "rb") if path.exists() else None
+                    if handles[day.year] is None:
+                        continue
+                    offset = (row * DAYS_PER_YEAR + day.timetuple().tm_yday - 1) * DAILY_WIDTH
+                    count, viewer_sum, peak, stream_sum = _read_at(handles[day.year], offset, DAILY_WIDTH)
+                    if count and count >= min_samples:
+                        per_day[f"{day:%Y-%m-%d}"] = {
+                            "peak": peak,
+                            "avg": round(viewer_sum / count),
+                            "hours_watched": round(viewer_sum * SLOT_MINUTES / 60),
+                            "avg_streams": round(stream_sum / count),
+                            "samples": count,
+                        }
+                if per_day:
+                    result[int(gid)] = per_day
+        finally:
+            for f in handles.values():
+                if f:
+                    f.close()
+        return result
+
+
+_series = None
+_series_lock = threading.Lock()
+
+
+def get_series():
+    global _series
+    with _series_lock:
+        if _series is None:
+            _series = ViewerSeries()
+        return _series